@@ -1,22 +1,138 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from elasticsearch import Elasticsearch
+from circuit_breaker import CircuitBreaker
+import embeddings
+from field_stats import StatsCache
+from local_search import LocalWorkbookIndex
+from observability import init_app as init_metrics, log_event, observe_es, observe_results, record_cache
+from response_cache import TTLCache
+from result_rows import ResultRow, SOURCE_FIELDS, to_columnar_rows
+from scatter_gather import BackendsUnavailableError, load_fallback_dirs, load_index_sets, reset_executor, scatter_search
+from singleflight import SingleFlight
+from wire_format import init_app as init_wire_format, dumps_bytes, wants_columnar
+import json
+import logging
 import os
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
 CORS(app)
+init_metrics(app)
+init_wire_format(app)
 
-# Elasticsearch configuration - Compatible with ES 8.x
-es = Elasticsearch(
-    ['http://localhost:9200'],
-    verify_certs=False,
-    ssl_show_warn=False,
-    request_timeout=30
+ES_URL = os.environ.get('ES_URL', 'http://localhost:9200')
+INDEX_NAME = 'excel_fields_data'
+
+# Request bodies (JSON list) to run at startup so popular searches start cached
+WARM_QUERIES_FILE = os.environ.get('WARM_QUERIES_FILE', '')
+
+# Circuit breaker: after this many consecutive ES failures, fail fast for a while
+ES_BREAKER_FAILURES = int(os.environ.get('ES_BREAKER_FAILURES', 3))
+ES_BREAKER_RESET = float(os.environ.get('ES_BREAKER_RESET', 15))
+
+# Semantic/hybrid search: nearest neighbours returned, HNSW candidates per
+# shard, and the weights of the kNN and BM25 scores in hybrid mode
+SEMANTIC_TOP_K = int(os.environ.get('SEMANTIC_TOP_K', 50))
+SEMANTIC_NUM_CANDIDATES = int(os.environ.get('SEMANTIC_NUM_CANDIDATES', 200))
+HYBRID_KNN_BOOST = float(os.environ.get('HYBRID_KNN_BOOST', 0.7))
+HYBRID_BM25_BOOST = float(os.environ.get('HYBRID_BM25_BOOST', 0.3))
+
+# Degraded mode: search the raw workbooks when no ES backend can answer
+FALLBACK_ENABLED = os.environ.get('FALLBACK_ENABLED', '1') == '1'
+FALLBACK_EXCEL_DIR = os.environ.get(
+    'FALLBACK_EXCEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server', 'excel-files')
+)
+FALLBACK_CACHE_DIR = os.environ.get(
+    'FALLBACK_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.fallback-cache')
 )
 
-INDEX_NAME = 'excel_fields_data'
+
+def create_es_client(url=ES_URL):
+    """Elasticsearch configuration - Compatible with ES 8.x"""
+    return Elasticsearch(
+        [url],
+        verify_certs=False,
+        ssl_show_warn=False,
+        request_timeout=30
+    )
+
+
+es = create_es_client()
+
+# Named sets of indices/clusters a search can fan out to (SEARCH_INDEX_SETS)
+INDEX_SETS = load_index_sets(ES_URL, INDEX_NAME)
+
+# Clients for clusters other than ES_URL, created on first use
+_cluster_clients = {}
+
+# One circuit breaker per cluster URL
+_breakers = {}
+
+# Column-oriented copy of each index set's workbooks for degraded-mode
+# searches; sets without a fallback directory get a 503 instead
+local_indexes = {
+    set_name: LocalWorkbookIndex(excel_dir, os.path.join(FALLBACK_CACHE_DIR, set_name))
+    for set_name, excel_dir in load_fallback_dirs(FALLBACK_EXCEL_DIR).items()
+}
+
+# Precomputed per-file/global summaries written by the indexer
+stats_cache = StatsCache(
+    es,
+    ttl=int(os.environ.get('STATS_CACHE_TTL', 300)),
+    retry_after=int(os.environ.get('STATS_RETRY_AFTER', 30)),
+    on_access=lambda hit: record_cache('stats', hit)
+)
+
+# Recent search responses, keyed by normalized request parameters
+search_cache = TTLCache(
+    maxsize=int(os.environ.get('SEARCH_CACHE_SIZE', 256)),
+    ttl=int(os.environ.get('SEARCH_CACHE_TTL', 60))
+)
+
+# Identical searches in flight at the same time share one ES round-trip
+# and one serialized response body
+search_flight = SingleFlight(on_shared=lambda shared: record_cache('search_inflight', shared))
+
+
+def init_worker():
+    """
+    Give this process its own Elasticsearch connection pool and cap the
+    embedding model's threads. Called by gunicorn after each worker forks,
+    since sockets inherited from the master must not be shared between
+    workers.
+    """
+    global es
+    embeddings.limit_threads()
+    es = create_es_client()
+    stats_cache.es = es
+    _cluster_clients.clear()
+    _breakers.clear()
+    reset_executor()
+    search_cache.clear()
+
+
+def client_for(url):
+    """Elasticsearch client for a cluster URL; ES_URL uses the main client"""
+    if url == ES_URL:
+        return es
+    client = _cluster_clients.get(url)
+    if client is None:
+        client = _cluster_clients.setdefault(url, create_es_client(url))
+    return client
+
+
+def breaker_for(url):
+    """Circuit breaker guarding the cluster at `url`"""
+    breaker = _breakers.get(url)
+    if breaker is None:
+        breaker = _breakers.setdefault(
+            url, CircuitBreaker(url, failure_threshold=ES_BREAKER_FAILURES, reset_timeout=ES_BREAKER_RESET)
+        )
+    return breaker
+
 
 # Excel directory (keeping for future OneDrive integration)
 EXCEL_DIR = os.path.join(os.path.dirname(__file__), 'excel-files')
@@ -36,6 +152,21 @@ HARDCODED_FILES = [
     "User_Registration_Fields.xlsx"
 ]
 
+_file_list = None
+
+
+def build_file_list():
+    """File list for the dropdown, built once per process"""
+    global _file_list
+    if _file_list is None:
+        _file_list = [
+            {"id": os.path.splitext(f)[0], "name": f}
+            for f in HARDCODED_FILES
+            if f and (f.endswith('.xlsx') or f.endswith('.xls'))
+        ]
+    return _file_list
+
+
 @app.route('/api/excel-files', methods=['GET'])
 def get_excel_files():
     """
@@ -43,16 +174,9 @@ def get_excel_files():
     Edit `HARDCODED_FILES` above to change what is shown.
     """
     try:
-        print("\n📂 Returning hard-coded file list for frontend")
-        files = [
-            {"id": os.path.splitext(f)[0], "name": f}
-            for f in HARDCODED_FILES
-            if f and (f.endswith('.xlsx') or f.endswith('.xls'))
-        ]
-       # print(f"  Files: {[f['name'] for f in files]}")
-        return {"files": files}
+        return {"files": build_file_list()}
     except Exception as e:
-        print(f"❌ Error building hard-coded file list: {e}")
+        log_event("file_list_failed", level=logging.ERROR, error=str(e))
         return {"error": str(e), "files": []}, 500
 
 # @app.route('/api/excel-files', methods=['GET'])
@@ -160,161 +284,362 @@ def get_excel_files():
 #         return {"error": str(e), "files": local_files}, 500
 
 
+SEARCH_PARAMS = ('fileName', 'fieldName', 'fieldType', 'visibilityRules', 'visibilityAttributes', 'indexSet', 'mode', 'collapse')
+
+# keyword: wildcard/substring matching on fieldName (the original behaviour)
+# semantic: kNN over field name + description embeddings
+# hybrid: kNN and BM25 scores combined
+SEARCH_MODES = ('keyword', 'semantic', 'hybrid')
+
+# Response parts run_search reads; drops _index/_id/_shards per hit and page
+SEARCH_FILTER_PATH = ['took', 'hits.total', 'hits.hits._score', 'hits.hits._source']
+
+
+def normalize_search_params(params):
+    """
+    Canonical form of a search request, used as the cache key.
+    Text filters are lower-cased since the query already matches
+    lower/upper/title variants; fileName is an exact term, so it is not.
+    """
+    params = params or {}
+    normalized = []
+    for key in SEARCH_PARAMS:
+        value = str(params.get(key) or '').strip()
+        if key != 'fileName':
+            value = value.lower()
+        normalized.append((key, value))
+    return tuple(normalized)
+
+
+def resolve_index_set(params):
+    """Index-set name from `indexSet` (or its alias `tenant`); defaults to 'default'"""
+    params = params or {}
+    return (params.get('indexSet') or params.get('tenant') or 'default').strip().lower()
+
+
+def wants_collapse(params):
+    """collapse as JSON true or a string such as 'true' or '1'"""
+    value = (params or {}).get('collapse')
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def resolve_mode(params):
+    """Search mode from `mode`; without a fieldName there is nothing to embed"""
+    params = params or {}
+    mode = (params.get('mode') or 'keyword').strip().lower()
+    if not (params.get('fieldName') or '').strip():
+        return 'keyword' if mode in SEARCH_MODES else mode
+    return mode
+
+
 @app.route('/api/search-excel', methods=['POST'])
 def search_excel():
     """
     Search Excel data using Elasticsearch with partial matching
     Accepts: fileName, fieldName, fieldType, visibilityRules, visibilityAttributes
+    Optional: format="columnar" returns {"columns": [...], "rows": [[...]]}
+    Optional: mode = keyword (default) | semantic | hybrid, how fieldName is matched
+    Optional: collapse=true returns one hit per near-duplicate field cluster
+    Optional: indexSet (alias tenant) fans out to that set's indices/clusters;
+    "partial": true means at least one backend was slow or failed
+    "degraded": true means Elasticsearch was unavailable and the results
+    come from the index set's local workbook copies; a set without any
+    answers 503
     """
     try:
-        params = request.json
-        
-        # Get search parameters (all optional)
-        filename = params.get('fileName', '').strip()
-        field_name = params.get('fieldName', '').strip()
-        field_type = params.get('fieldType', '').strip()
-        visibility_rules = params.get('visibilityRules', '').strip()
-        visibility_attributes = params.get('visibilityAttributes', '').strip()
-        
-        print(f"\n{'='*70}")
-        print(f"🔍 SEARCH REQUEST")
-        print('='*70)
-        print(f"  File: '{filename}'")
-        print(f"  Field Name: '{field_name}'")
-        print(f"  Field Type: '{field_type}'")
-        print(f"  Visibility Rules: '{visibility_rules}'")
-        print(f"  Visibility Attributes: '{visibility_attributes}'")
+        params = dict(request.json or {})
+        params['indexSet'] = resolve_index_set(params)
+        if params['indexSet'] not in INDEX_SETS:
+            return {"error": f"Unknown index set: {params['indexSet']}", "results": []}, 400
+        params['mode'] = resolve_mode(params)
+        if params['mode'] not in SEARCH_MODES:
+            return {"error": f"Unknown search mode: {params['mode']}", "results": []}, 400
+        if params['mode'] != 'keyword' and not embeddings.available():
+            return {"error": "Semantic search is not available on this server", "results": []}, 400
         
-        # Build Elasticsearch query
-        must_conditions = []
-        
-        # Add file filter if specified
-        if filename:
-            if not filename.endswith('.xlsx'):
-                filename = filename + '.xlsx'
+        columnar = wants_columnar(params)
+        body = search_flight.do(
+            (normalize_search_params(params), columnar), search_response_body, params, columnar
+        )
+        return app.response_class(body, mimetype='application/json')
+    
+    except BackendsUnavailableError as e:
+        log_event("search_unavailable", level=logging.ERROR, error=str(e))
+        return {"error": str(e), "results": []}, 503
 
-            must_conditions.append({
-                            "term": {
-                            "filename": filename
-        }
-    })
+    except Exception as e:
+        log_event("search_failed", level=logging.ERROR, exc_info=True, error=str(e))
+        return {"error": str(e), "results": []}, 500
 
-        # Add field_name search with partial matching
-        if field_name:
-            must_conditions.append({
-                "bool": {
-                    "should": [
-                        {"wildcard": {"field_name": f"*{field_name.lower()}*"}},
-                        {"wildcard": {"field_name": f"*{field_name.upper()}*"}},
-                        {"wildcard": {"field_name": f"*{field_name.title()}*"}},
-                        {"match": {"field_name": field_name}}
-                    ],
-                    "minimum_should_match": 1
-                }
-            })
-        
-        # Add field_type search with partial matching
-        if field_type:
-            must_conditions.append({
-                "bool": {
-                    "should": [
-                        {"wildcard": {"field_type": f"*{field_type.lower()}*"}},
-                        {"wildcard": {"field_type": f"*{field_type.upper()}*"}},
-                        {"wildcard": {"field_type": f"*{field_type.title()}*"}},
-                        {"match": {"field_type": field_type}}
-                    ],
-                    "minimum_should_match": 1
-                }
-            })
-        
-        # Add visibility_rules search with partial matching
-        if visibility_rules:
-            must_conditions.append({
-                "bool": {
-                    "should": [
-                        {"wildcard": {"visibility_rules": f"*{visibility_rules.lower()}*"}},
-                        {"wildcard": {"visibility_rules": f"*{visibility_rules.upper()}*"}},
-                        {"wildcard": {"visibility_rules": f"*{visibility_rules.title()}*"}},
-                        {"match": {"visibility_rules": visibility_rules}}
-                    ],
-                    "minimum_should_match": 1
-                }
-            })
-        
-        # Add visibility_attributes search with partial matching
-        if visibility_attributes:
-            must_conditions.append({
-                "bool": {
-                    "should": [
-                        {"wildcard": {"visibility_attributes": f"*{visibility_attributes.lower()}*"}},
-                        {"wildcard": {"visibility_attributes": f"*{visibility_attributes.upper()}*"}},
-                        {"wildcard": {"visibility_attributes": f"*{visibility_attributes.title()}*"}},
-                        {"match": {"visibility_attributes": visibility_attributes}}
-                    ],
-                    "minimum_should_match": 1
-                }
-            })
-        
+
+def search_response_body(params, columnar=False):
+    """Serialized JSON body for a search request, in row or columnar shape"""
+    response = cached_search(params)
+    if columnar:
+        shaped = to_columnar_rows(response['results'])
+        shaped.update((k, v) for k, v in response.items() if k != 'results')
+        response = shaped
+    return dumps_bytes(response)
+
+
+def cached_search(params):
+    """
+    run_search() through the response cache, falling back to the index
+    set's local workbooks when no ES backend answers. Partial and degraded
+    responses are not cached, so recovery is visible immediately.
+    """
+    key = normalize_search_params(params)
+    response = search_cache.get(key)
+    record_cache('search', response is not None)
+    if response is not None:
+        return response
+
+    try:
+        response = run_search(params)
+    except BackendsUnavailableError as e:
+        if not FALLBACK_ENABLED or resolve_index_set(params) not in local_indexes:
+            raise
+        log_event("search_degraded", level=logging.WARNING, error=str(e))
+        return run_local_search(params, reason=str(e))
+
+    if not response['partial']:
+        search_cache.set(key, response)
+    return response
+
+
+def run_local_search(params, reason=''):
+    """Degraded-mode search over the index set's workbooks, same response contract"""
+    local_index = local_indexes[resolve_index_set(params)]
+    results, total = local_index.search(params, size=1000)
+    observe_results(len(results))
+    return {
+        "results": results,
+        "partial": False,
+        "degraded": True,
+        "reason": reason,
+        "backends": []
+    }
+
+
+def run_search(params):
+    """Build and execute the Elasticsearch query for a search request"""
+    # Get search parameters (all optional)
+    filename = (params.get('fileName') or '').strip()
+    field_name = (params.get('fieldName') or '').strip()
+    field_type = (params.get('fieldType') or '').strip()
+    visibility_rules = (params.get('visibilityRules') or '').strip()
+    visibility_attributes = (params.get('visibilityAttributes') or '').strip()
+    mode = resolve_mode(params)
+    collapse = wants_collapse(params)
+    
+    # Build Elasticsearch query
+    must_conditions = []
+    
+    # Add file filter if specified
+    if filename:
+        if not filename.endswith('.xlsx'):
+            filename = filename + '.xlsx'
+
+        must_conditions.append({
+                        "term": {
+                        "filename": filename
+    }
+})
+
+    # Add field_name search with partial matching (semantic modes rank instead)
+    if field_name and mode == 'keyword':
+        must_conditions.append({
+            "bool": {
+                "should": [
+                    {"wildcard": {"field_name": f"*{field_name.lower()}*"}},
+                    {"wildcard": {"field_name": f"*{field_name.upper()}*"}},
+                    {"wildcard": {"field_name": f"*{field_name.title()}*"}},
+                    {"match": {"field_name": field_name}}
+                ],
+                "minimum_should_match": 1
+            }
+        })
+    
+    # Add field_type search with partial matching
+    if field_type:
+        must_conditions.append({
+            "bool": {
+                "should": [
+                    {"wildcard": {"field_type": f"*{field_type.lower()}*"}},
+                    {"wildcard": {"field_type": f"*{field_type.upper()}*"}},
+                    {"wildcard": {"field_type": f"*{field_type.title()}*"}},
+                    {"match": {"field_type": field_type}}
+                ],
+                "minimum_should_match": 1
+            }
+        })
+    
+    # Add visibility_rules search with partial matching
+    if visibility_rules:
+        must_conditions.append({
+            "bool": {
+                "should": [
+                    {"wildcard": {"visibility_rules": f"*{visibility_rules.lower()}*"}},
+                    {"wildcard": {"visibility_rules": f"*{visibility_rules.upper()}*"}},
+                    {"wildcard": {"visibility_rules": f"*{visibility_rules.title()}*"}},
+                    {"match": {"visibility_rules": visibility_rules}}
+                ],
+                "minimum_should_match": 1
+            }
+        })
+    
+    # Add visibility_attributes search with partial matching
+    if visibility_attributes:
+        must_conditions.append({
+            "bool": {
+                "should": [
+                    {"wildcard": {"visibility_attributes": f"*{visibility_attributes.lower()}*"}},
+                    {"wildcard": {"visibility_attributes": f"*{visibility_attributes.upper()}*"}},
+                    {"wildcard": {"visibility_attributes": f"*{visibility_attributes.title()}*"}},
+                    {"match": {"visibility_attributes": visibility_attributes}}
+                ],
+                "minimum_should_match": 1
+            }
+        })
+    
+    if mode != 'keyword':
+        search_kwargs = semantic_search_kwargs(mode, field_name, must_conditions)
+        size = SEMANTIC_TOP_K
+    else:
         # If no conditions, return all documents
         if not must_conditions:
             search_query = {"match_all": {}}
-            print("  ℹ️  No filters - returning all documents")
         else:
             search_query = {
                 "bool": {
                     "must": must_conditions
                 }
             }
+        search_kwargs = {"query": search_query}
+        size = 1000  # Adjust based on your needs
+    
+    # One hit per cluster of near-duplicate fields (see dedupe_fields.py)
+    if collapse:
+        search_kwargs["collapse"] = {"field": "field_cluster_id"}
+    
+    # Execute search on every backend of the index set concurrently
+    backends = INDEX_SETS[resolve_index_set(params)]
+    es_started = time.perf_counter()
+    result = scatter_search(
+        backends,
+        client_for,
+        breaker_for=breaker_for,
+        size=size,
+        # Only the fields a result needs: no vectors, timestamps or unused columns
+        source_includes=SOURCE_FIELDS + ['field_cluster_id'] if collapse else SOURCE_FIELDS,
+        filter_path=SEARCH_FILTER_PATH,
+        **search_kwargs
+    )
+    observe_es(result['took'], es_started)
+    
+    total = result['total']
+    
+    # Format results to match frontend expectations
+    results = []
+    seen_clusters = set()
+    for hit, _ in result['hits']:
+        doc = hit['_source']
         
-        # Execute search
-        result = es.search(
-            index=INDEX_NAME,
-            query=search_query,
-            size=1000  # Adjust based on your needs
-        )
-        
-        total = result['hits']['total']['value']
-        print(f"\n✅ Found {total} result(s)")
-        
-        # Format results to match frontend expectations
-        results = []
-        for hit in result['hits']['hits']:
-            doc = hit['_source']
-            
-            # Map Elasticsearch fields to frontend format (camelCase)
-            result_item = {
-                'fieldName': doc.get('field_name', ''),
-                'description': doc.get('description', ''),
-                'fieldType': doc.get('field_type', ''),
-                'format': doc.get('format', ''),
-                'fieldLength': doc.get('field_length', ''),
-                'defaultValue': doc.get('default_value', ''),
-                'validValues': doc.get('valid_values', ''),
-                'fieldBehaviour': doc.get('field_behaviour', ''),
-                'visibilityRules': doc.get('visibility_rules', ''),
-                'visibilityAttributes': doc.get('visibility_attributes', ''),
-                'sourceFile': doc.get('filename', ''),
-                'rowNumber': doc.get('row_number', '')
-            }
-            
-            results.append(result_item)
-        
-        print(f"✅ Returning {len(results)} results to frontend")
-        
-        # Print first result as sample
-        if results:
-            print(f"\n📄 Sample result:")
-            print(f"   Field: {results[0]['fieldName']}")
-            print(f"   Type: {results[0]['fieldType']}")
-            print(f"   File: {results[0]['sourceFile']}")
+        # Each backend collapses on its own; drop duplicates across backends
+        if collapse:
+            cluster_id = doc.get('field_cluster_id')
+            if cluster_id is not None:
+                if cluster_id in seen_clusters:
+                    continue
+                seen_clusters.add(cluster_id)
         
-        return {"results": results}
+        # Map Elasticsearch fields to frontend format (camelCase)
+        results.append(ResultRow.from_source(doc))
+    
+    observe_results(len(results))
+    log_event(
+        "search",
+        file=filename,
+        field_name=field_name,
+        field_type=field_type,
+        visibility_rules=visibility_rules,
+        visibility_attributes=visibility_attributes,
+        total=total,
+        returned=len(results),
+        es_took_ms=result['took'],
+        index_set=resolve_index_set(params),
+        mode=mode,
+        collapse=collapse,
+        partial=result['partial']
+    )
     
+    return {
+        "results": results,
+        "partial": result['partial'],
+        "degraded": False,
+        "backends": result['backends']
+    }
+
+
+def semantic_search_kwargs(mode, text, filters):
+    """
+    es.search() arguments for semantic or hybrid mode. The other search
+    fields become kNN pre-filters, so the k neighbours all satisfy them.
+    """
+    knn = {
+        "field": embeddings.VECTOR_FIELD,
+        "query_vector": embeddings.encode_query(text),
+        "k": SEMANTIC_TOP_K,
+        "num_candidates": max(SEMANTIC_NUM_CANDIDATES, SEMANTIC_TOP_K)
+    }
+    if filters:
+        knn["filter"] = filters
+    if mode == 'semantic':
+        return {"knn": knn}
+
+    # Hybrid: documents found by either side, scored by the weighted sum
+    knn["boost"] = HYBRID_KNN_BOOST
+    return {
+        "knn": knn,
+        "query": {
+            "bool": {
+                "filter": filters,
+                "must": [{
+                    "multi_match": {
+                        "query": text,
+                        "fields": ["field_name^2", "description"],
+                        "boost": HYBRID_BM25_BOOST
+                    }
+                }]
+            }
+        }
+    }
+
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness():
+    """
+    Liveness probe: the worker is up and serving requests.
+    Does not touch Elasticsearch, so an ES outage never restarts workers.
+    """
+    return {"status": "alive", "pid": os.getpid()}
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness probe: this worker can reach Elasticsearch.
+    A single short-timeout ping, no count or search, so it is cheap to poll.
+    """
+    try:
+        circuit = breaker_for(ES_URL).state
+        if es.options(request_timeout=2).ping():
+            return {"status": "ready", "circuit": circuit}
+        return {"status": "not_ready", "elasticsearch": "disconnected", "circuit": circuit}, 503
     except Exception as e:
-        print(f"❌ Error in search: {e}")
-        import traceback
-        traceback.print_exc()
-        return {"error": str(e), "results": []}, 500
+        return {"status": "not_ready", "message": str(e)}, 503
 
 
 @app.route('/api/health', methods=['GET'])
@@ -344,34 +669,49 @@ def health_check():
         }, 500
 
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """
+    Per-file and global catalog summaries (row counts, field type
+    distribution, null rates, distinct valid values).
+    Served from the in-process summary cache, never aggregated live.
+    Optional query param: file=<filename>
+    """
+    try:
+        filename = request.args.get('file', '').strip()
+        if filename:
+            if not filename.endswith('.xlsx'):
+                filename = filename + '.xlsx'
+            summary = stats_cache.file_summary(filename)
+            if summary is None:
+                return {"error": f"No summary for {filename}"}, 404
+            return {"file": summary}
+
+        return {
+            "global": stats_cache.global_summary(),
+            "files": stats_cache.file_summaries()
+        }
+    
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
 @app.route('/api/debug/field-types', methods=['GET'])
 def get_field_types():
     """
     Debug endpoint to get all unique field types in the index
+    (served from the precomputed global summary)
     """
     try:
-        result = es.search(
-            index=INDEX_NAME,
-            body={
-                "size": 0,
-                "aggs": {
-                    "unique_types": {
-                        "terms": {
-                            "field": "field_type.keyword",
-                            "size": 100
-                        }
-                    }
-                }
-            }
-        )
-        
-        buckets = result['aggregations']['unique_types']['buckets']
+        summary = stats_cache.global_summary() or {}
         field_types = [
             {
-                "type": bucket['key'],
-                "count": bucket['doc_count']
+                "type": field_type,
+                "count": count
             }
-            for bucket in buckets
+            for field_type, count in sorted(
+                summary.get('field_types', {}).items(), key=lambda kv: -kv[1]
+            )
         ]
         
         return {"fieldTypes": field_types}
@@ -402,27 +742,23 @@ def get_sample_doc():
         return {"error": str(e)}, 500
 
 
-if __name__ == '__main__':
-    print("\n" + "="*70)
-    print("🚀 STARTING FLASK SERVER WITH ELASTICSEARCH")
-    print("="*70)
-    
+def run_startup_diagnostics():
+    """Print connection and index details; used by the development server only"""
     # Check Elasticsearch connection on startup
     print("\n📊 Checking Elasticsearch connection...")
     try:
         if es.ping():
-            print("✅ Connected to Elasticsearch at http://localhost:9200")
+            print(f"✅ Connected to Elasticsearch at {ES_URL}")
             try:
-                stats = es.count(index=INDEX_NAME)
-                print(f"✅ Index '{INDEX_NAME}' has {stats['count']} documents")
-                
-                # Get a sample document to show field structure
-                sample = es.search(index=INDEX_NAME, query={"match_all": {}}, size=1)
-                if sample['hits']['hits']:
-                    doc = sample['hits']['hits'][0]['_source']
-                    print(f"\n📄 Sample document fields:")
-                    for key in doc.keys():
-                        print(f"   - {key}: {doc[key]}")
+                # Summaries come from the indexer; no live count/sample queries
+                stats_cache.load()
+                summary = stats_cache.global_summary()
+                if summary:
+                    print(f"✅ Index '{INDEX_NAME}' has {summary['row_count']} rows "
+                          f"across {summary['file_count']} file(s)")
+                    print(f"\n📊 Field types: {summary['field_types']}")
+                else:
+                    print(f"⚠️  No summaries found - run the indexer to build them")
                 
             except Exception as e:
                 print(f"⚠️  Warning with index '{INDEX_NAME}': {e}")
@@ -435,6 +771,59 @@ if __name__ == '__main__':
         print("   Make sure Docker container is running")
         import traceback
         traceback.print_exc()
+
+
+def warm_caches():
+    """
+    Pre-load the file list, the summary cache, the embedding model and the
+    searches listed in WARM_QUERIES_FILE so the first real requests are
+    served from cache.
+    """
+    build_file_list()
+    if FALLBACK_ENABLED:
+        for set_name, local_index in local_indexes.items():
+            try:
+                local_index.refresh(force=True)
+            except Exception as e:
+                log_event("warm_fallback_failed", level=logging.WARNING, index_set=set_name, error=str(e))
+    try:
+        stats_cache.load()
+    except Exception as e:
+        log_event("warm_stats_failed", level=logging.WARNING, error=str(e))
+    if embeddings.available():
+        try:
+            embeddings.get_model()
+        except Exception as e:
+            log_event("warm_embeddings_failed", level=logging.WARNING, error=str(e))
+
+    if not WARM_QUERIES_FILE:
+        return
+    try:
+        with open(WARM_QUERIES_FILE) as f:
+            queries = json.load(f)
+    except Exception as e:
+        log_event("warm_queries_unreadable", level=logging.WARNING, path=WARM_QUERIES_FILE, error=str(e))
+        return
+    for params in queries:
+        try:
+            # Same parameter resolution as search_excel, so the cache keys match
+            params = dict(params, indexSet=resolve_index_set(params), mode=resolve_mode(params))
+            response = cached_search(params)
+        except Exception as e:
+            log_event("warm_query_failed", level=logging.WARNING, params=params, error=str(e))
+            continue
+        if response['degraded']:
+            # ES is unreachable; degraded answers are not cached, so stop here
+            log_event("warm_queries_skipped", level=logging.WARNING, reason=response.get('reason', ''))
+            break
+
+
+if __name__ == '__main__':
+    print("\n" + "="*70)
+    print("🚀 STARTING FLASK SERVER WITH ELASTICSEARCH")
+    print("="*70)
+    
+    run_startup_diagnostics()
     
     # Ensure Excel directory exists (for future OneDrive integration)
     if not os.path.exists(EXCEL_DIR):
@@ -448,6 +837,10 @@ if __name__ == '__main__':
     print("  GET  /api/excel-files          - List all files")
     print("  POST /api/search-excel         - Search records")
     print("  GET  /api/health               - Health check")
+    print("  GET  /api/health/live          - Liveness probe")
+    print("  GET  /api/health/ready         - Readiness probe")
+    print("  GET  /api/stats                - Catalog summaries")
+    print("  GET  /metrics                  - Prometheus metrics")
     print("  GET  /api/debug/field-types    - Debug field types")
     print("  GET  /api/debug/sample-doc     - See sample document")
     print("\n💡 Test in browser:")
@@ -456,4 +849,5 @@ if __name__ == '__main__':
     print("   http://localhost:3001/api/debug/sample-doc")
     print("\n" + "="*70 + "\n")
     
-    app.run(host='0.0.0.0', port=3001, debug=True)
\ No newline at end of file
+    # Development server only; production runs under gunicorn (gunicorn.conf.py)
+    app.run(host='0.0.0.0', port=3001, debug=os.environ.get('FLASK_DEBUG', '1') == '1')
\ No newline at end of file
@@ -2,9 +2,18 @@
 import msal
 import requests
 import io
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import pandas as pd
 from elasticsearch import Elasticsearch, helpers
-from datetime import datetime
+from excel_documents import build_actions
+import embeddings
+from field_stats import summarize_dataframe, store_summaries
+from index_template import (
+    put_index_template, create_index, begin_bulk_load, end_bulk_load
+)
+from ingest_profile import IngestProfiler
 
 # ============ CONFIGURATION ============
 CLIENT_ID = ""  # ← PUT YOUR CLIENT_ID HERE
@@ -12,6 +21,8 @@ AUTHORITY = "https://login.microsoftonline.com/common"
 SCOPES = ["Files.Read.All", "User.Read"]
 ONEDRIVE_FOLDER = "Excel"  # ← Your OneDrive folder name
 INDEX_NAME = 'excel_fields_data'  # ← Elasticsearch index name
+GRAPH_MAX_RETRIES = 3  # ← Retries for throttled/unavailable Graph requests
+GRAPH_TIMEOUT = 60  # ← Seconds per Graph request (connect and read)
 
 # ============ ELASTICSEARCH CONNECTION ============
 es = Elasticsearch(['http://localhost:9200'])
@@ -40,49 +51,58 @@ def authenticate_onedrive():
 
 
 def create_elasticsearch_index():
-    """Create Elasticsearch index with mapping for your new Excel structure"""
-    mapping = {
-        "properties": {
-            # Your new Excel columns (based on the image)
-            "field_name": {"type": "text"},
-            "description": {"type": "text"},
-            "field_type": {"type": "keyword"},
-            "format": {"type": "text"},
-            "field_length": {"type": "text"},
-            "default_value": {"type": "text"},
-            "valid_values": {"type": "text"},
-            "field_behaviour": {"type": "text"},
-            "visibility_rules": {"type": "text"},
-            "visibility_attributes": {"type": "text"},
-            
-            # Metadata
-            "filename": {"type": "keyword"},
-            "row_number": {"type": "integer"},
-            "indexed_at": {"type": "date"}
-        }
-    }
-    
-    # Delete existing index
-    if es.indices.exists(index=INDEX_NAME):
-        es.indices.delete(index=INDEX_NAME)
-        print(f"✓ Deleted existing index: {INDEX_NAME}")
+    """Create Elasticsearch index using the tuned profile from index_template"""
+    # Keep the composable template in sync so per-unit indices match too
+    put_index_template(es)
     
-    # Create new index
-    es.indices.create(index=INDEX_NAME, mappings=mapping)
+    # Delete existing index and create new one
+    create_index(es, INDEX_NAME, recreate=True)
     print(f"✓ Created new index: {INDEX_NAME}\n")
 
 
-def clean_value(value):
-    """Clean cell values"""
-    if pd.isna(value):
-        return None
-    return str(value).strip()
+def retry_after_seconds(value, default):
+    """Retry-After header as seconds; Graph sends either seconds or an HTTP-date"""
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def graph_get(url, headers, profiler, file=None):
+    """
+    GET from Microsoft Graph, retrying connection errors, timeouts and
+    429/5xx responses with Retry-After (or exponential) backoff
+    """
+    for attempt in range(GRAPH_MAX_RETRIES + 1):
+        try:
+            response = requests.get(url, headers=headers, timeout=GRAPH_TIMEOUT)
+        except requests.RequestException:
+            if attempt == GRAPH_MAX_RETRIES:
+                raise
+            profiler.count('retries', file=file)
+            time.sleep(2 ** attempt)
+            continue
+        if response.status_code not in (429, 500, 502, 503, 504) or attempt == GRAPH_MAX_RETRIES:
+            return response
+        profiler.count('retries', file=file)
+        time.sleep(retry_after_seconds(response.headers.get('Retry-After'), 2 ** attempt))
 
 
-def index_excel_from_onedrive(access_token, folder_path):
+def index_excel_from_onedrive(access_token, folder_path, profiler=None):
     """
-    Read Excel files from OneDrive and index them into Elasticsearch
+    Read Excel files from OneDrive and index them into Elasticsearch.
+    Stage timings and counters are recorded on `profiler`.
     """
+    profiler = profiler or IngestProfiler()
     headers = {"Authorization": f"Bearer {access_token}"}
     url = f"https://graph.microsoft.com/v1.0/me/drive/root:/{folder_path}:/children"
     
@@ -91,7 +111,8 @@ def index_excel_from_onedrive(access_token, folder_path):
     print("="*70 + "\n")
     
     # Get list of files in OneDrive folder
-    response = requests.get(url, headers=headers)
+    with profiler.stage('graph_list'):
+        response = graph_get(url, headers, profiler)
     
     if response.status_code != 200:
         print(f"❌ Error accessing OneDrive folder: {response.status_code}")
@@ -111,6 +132,10 @@ def index_excel_from_onedrive(access_token, folder_path):
     print(f"📁 Found {len(excel_files)} Excel file(s) in OneDrive\n")
     
     total_docs = 0
+    summaries = []
+    
+    # No refreshes or replicas while bulk loading
+    begin_bulk_load(es, INDEX_NAME)
     
     for i, item in enumerate(excel_files, 1):
         filename = item["name"]
@@ -121,55 +146,49 @@ def index_excel_from_onedrive(access_token, folder_path):
         try:
             # Download file content
             content_url = f"https://graph.microsoft.com/v1.0/me/drive/items/{file_id}/content"
-            file_response = requests.get(content_url, headers=headers)
+            with profiler.stage('download', file=filename):
+                file_response = graph_get(content_url, headers, profiler, file=filename)
             
             if file_response.status_code != 200:
                 print(f"   ✗ Failed to download file: {file_response.status_code}")
+                profiler.fail(filename, f"download failed: HTTP {file_response.status_code}")
                 continue
+            profiler.count('bytes', len(file_response.content), file=filename)
             
             # Read Excel file into DataFrame
-            df = pd.read_excel(io.BytesIO(file_response.content))
+            with profiler.stage('parse', file=filename):
+                df = pd.read_excel(io.BytesIO(file_response.content))
+            profiler.count('rows', len(df), file=filename)
             
             print(f"   → Found {len(df)} rows")
             
+            # Per-file summary while the DataFrame is still in memory
+            with profiler.stage('summarize', file=filename):
+                summaries.append(summarize_dataframe(df, filename))
+            
             # Prepare documents for Elasticsearch
-            actions = []
+            with profiler.stage('build_docs', file=filename):
+                actions = build_actions(df, filename, INDEX_NAME, embed=False)
             
-            for idx, row in df.iterrows():
-                # Map your Excel columns to Elasticsearch fields
-                # Adjust column names based on your actual Excel headers
-                doc = {
-                    'field_name': clean_value(row.get('Field Name')),
-                    'description': clean_value(row.get('Description')),
-                    'field_type': clean_value(row.get('Field Type')),
-                    'format': clean_value(row.get('Format')),
-                    'field_length': clean_value(row.get('Field Length')),
-                    'default_value': clean_value(row.get('Default Value')),
-                    'valid_values': clean_value(row.get('Valid Values')),
-                    'field_behaviour': clean_value(row.get('Field Behaviour')),
-                    'visibility_rules': clean_value(row.get('Visibility Rules')),
-                    'visibility_attributes': clean_value(row.get('Visibility Attributes')),
-                    'filename': filename,
-                    'row_number': idx + 2,  # +2 because Excel row 1 is header
-                    'indexed_at': datetime.now().isoformat()
-                }
-                
-                action = {
-                    "_index": INDEX_NAME,
-                    "_source": doc
-                }
-                actions.append(action)
+            # Field name + description vectors for semantic search, in batches
+            if actions and embeddings.available():
+                with profiler.stage('embed', file=filename):
+                    embeddings.add_embeddings([action["_source"] for action in actions])
             
             # Bulk index to Elasticsearch
             if actions:
-                success, failed = helpers.bulk(es, actions, raise_on_error=False)
+                with profiler.stage('bulk', file=filename):
+                    success, failed = helpers.bulk(es, actions, raise_on_error=False)
+                profiler.count('docs', success, file=filename)
                 print(f"   ✓ Indexed {success} documents")
                 if failed:
                     print(f"   ✗ Failed: {len(failed)} documents")
+                    profiler.count('docs_failed', len(failed), file=filename)
                 total_docs += success
             
         except Exception as e:
             print(f"   ✗ Error processing file: {str(e)}")
+            profiler.fail(filename, e)
         
         print()
     
@@ -178,9 +197,15 @@ def index_excel_from_onedrive(access_token, folder_path):
     print(f"Total documents indexed: {total_docs}")
     print("="*70)
     
-    # Refresh index to make data searchable immediately
+    # Restore refresh interval and refresh to make data searchable immediately
     print("\n🔄 Refreshing index...")
-    es.indices.refresh(index=INDEX_NAME)
+    with profiler.stage('refresh'):
+        end_bulk_load(es, INDEX_NAME)
+    
+    # Store per-file and global summaries for /api/stats
+    with profiler.stage('store_summaries'):
+        store_summaries(es, summaries)
+    print(f"📊 Stored summaries for {len(summaries)} file(s)")
     
     return total_docs
 
@@ -262,11 +287,22 @@ if __name__ == "__main__":
         print(f"❌ OneDrive authentication failed: {e}")
         exit(1)
     
-    # Create Elasticsearch index
-    create_elasticsearch_index()
+    # Per-stage timings/counters, plus optional cProfile/py-spy (INDEXER_PROFILE)
+    profiler = IngestProfiler()
+    profiler.start_profiler()
     
-    # Index files from OneDrive
-    total_docs = index_excel_from_onedrive(access_token, ONEDRIVE_FOLDER)
+    try:
+        # Create Elasticsearch index
+        with profiler.stage('create_index'):
+            create_elasticsearch_index()
+        
+        # Index files from OneDrive
+        total_docs = index_excel_from_onedrive(access_token, ONEDRIVE_FOLDER, profiler) or 0
+    finally:
+        profiler.finish()
+        report_path = profiler.write_report()
+        print(f"\n⏱️  Run report written to {report_path}")
+        print(f"   Stages: {profiler.report()['stages']}")
     
     if total_docs > 0:
         # Verify and show samples
@@ -0,0 +1 @@
+"""Benchmarks for the Excel field-catalog search stack."""
@@ -0,0 +1,85 @@
+"""
+Concurrency check for search request coalescing.
+
+Fires bursts of N identical concurrent POST /api/search-excel requests at
+Backend.py (response cache disabled, stand-in Elasticsearch with a fixed
+latency) and counts how many ES queries each burst caused. With coalescing
+the count stays at ~1 per burst however large N gets.
+
+    python -m benchmarks.coalescing --concurrency 1 10 50 100
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from benchmarks.stand_in import StandInElasticsearch
+
+DOCS = [
+    {"field_name": f"Customer Field {i}", "field_type": "String", "filename": "Customer_Fields.xlsx", "row_number": i + 2}
+    for i in range(200)
+]
+
+
+class SlowStandIn(StandInElasticsearch):
+    """Stand-in with a fixed per-query latency, so requests overlap"""
+
+    def __init__(self, docs, latency):
+        super().__init__(docs)
+        self.latency = latency
+
+    def search(self, **kwargs):
+        time.sleep(self.latency)
+        return super().search(**kwargs)
+
+
+def burst(app, n, body):
+    """n threads released together, each sending `body`; returns status codes"""
+    barrier = threading.Barrier(n)
+    statuses = [None] * n
+
+    def worker(i):
+        client = app.test_client()
+        barrier.wait()
+        statuses[i] = client.post('/api/search-excel', json=body).status_code
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100])
+    parser.add_argument('--latency', type=float, default=0.2, help='stand-in ES latency in seconds')
+    args = parser.parse_args()
+
+    import Backend
+    es = SlowStandIn(DOCS, args.latency)
+    Backend.es = es
+    Backend.search_cache.ttl = 0  # isolate coalescing from the response cache
+
+    body = {"fieldName": "customer"}
+    rows, ok = [], True
+    for n in args.concurrency:
+        es.search_calls = 0
+        start = time.perf_counter()
+        statuses = burst(Backend.app, n, body)
+        elapsed = time.perf_counter() - start
+        es_queries = es.search_calls
+        rows.append({"concurrency": n, "es_queries": es_queries, "seconds": round(elapsed, 3),
+                     "all_ok": all(s == 200 for s in statuses)})
+        # Requests that arrive after the leader finished may start a second flight
+        ok &= es_queries <= 2 and all(s == 200 for s in statuses)
+
+    print(json.dumps(rows, indent=2))
+    print("✅ ES query count stays flat" if ok else "❌ ES query count grew with duplicate load")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
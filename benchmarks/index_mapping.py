@@ -0,0 +1,172 @@
+"""
+Compare the original index mapping against the tuned profile in index_template.
+
+Loads the same documents into two scratch indices and reports index size,
+indexing throughput and query latency for a search_excel-style query mix.
+
+    python -m benchmarks.index_mapping --copies 200 --rounds 50
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+import pandas as pd
+from elasticsearch import Elasticsearch, helpers
+
+from excel_documents import build_documents
+from index_template import INDEX_SETTINGS, INDEX_MAPPINGS, BULK_LOAD_SETTINGS, REFRESH_INTERVAL
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_EXCEL_DIR = os.path.join(ROOT_DIR, 'server', 'excel-files')
+
+# Mapping created by create_elasticsearch_index() before index_template existed
+LEGACY_MAPPINGS = {
+    "properties": {
+        "field_name": {"type": "text"},
+        "description": {"type": "text"},
+        "field_type": {"type": "keyword"},
+        "format": {"type": "text"},
+        "field_length": {"type": "text"},
+        "default_value": {"type": "text"},
+        "valid_values": {"type": "text"},
+        "field_behaviour": {"type": "text"},
+        "visibility_rules": {"type": "text"},
+        "visibility_attributes": {"type": "text"},
+        "filename": {"type": "keyword"},
+        "row_number": {"type": "integer"},
+        "indexed_at": {"type": "date"}
+    }
+}
+
+PROFILES = {
+    "legacy": {"settings": {}, "mappings": LEGACY_MAPPINGS, "type_facet": "field_type"},
+    "tuned": {"settings": INDEX_SETTINGS, "mappings": INDEX_MAPPINGS, "type_facet": "field_type.keyword"},
+}
+
+
+def _partial(field, value):
+    """Same clause shape search_excel builds for a partial match"""
+    return {
+        "bool": {
+            "should": [
+                {"wildcard": {field: f"*{value.lower()}*"}},
+                {"wildcard": {field: f"*{value.upper()}*"}},
+                {"wildcard": {field: f"*{value.title()}*"}},
+                {"match": {field: value}}
+            ],
+            "minimum_should_match": 1
+        }
+    }
+
+
+def query_mix(filename, type_facet):
+    """Representative queries: name search, type filter, file filter, facet"""
+    return [
+        ("field_name", {"query": _partial("field_name", "id"), "size": 1000}),
+        ("field_type", {"query": _partial("field_type", "string"), "size": 1000}),
+        ("file_and_name", {
+            "query": {"bool": {"must": [{"term": {"filename": filename}}, _partial("field_name", "date")]}},
+            "size": 1000
+        }),
+        ("match_all", {"query": {"match_all": {}}, "size": 1000}),
+        ("type_facet", {"size": 0, "aggs": {"t": {"terms": {"field": type_facet, "size": 100}}}}),
+    ]
+
+
+def load_documents(excel_dir, copies):
+    """Read every workbook once and replicate its rows `copies` times"""
+    docs = []
+    for path in sorted(glob.glob(os.path.join(excel_dir, '*.xlsx'))):
+        df = pd.read_excel(path)
+        base = os.path.splitext(os.path.basename(path))[0]
+        for n in range(copies):
+            docs.extend(build_documents(df, f"{base}_{n}.xlsx"))
+    return docs
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def bench_profile(es, name, profile, docs, rounds):
+    index = f"excel_fields_bench_{name}"
+    if es.indices.exists(index=index):
+        es.indices.delete(index=index)
+    es.indices.create(index=index, settings=profile["settings"] or None, mappings=profile["mappings"])
+
+    # Indexing throughput
+    if profile["settings"]:
+        es.indices.put_settings(index=index, settings=BULK_LOAD_SETTINGS)
+    start = time.perf_counter()
+    success, _ = helpers.bulk(es, ({"_index": index, "_source": d} for d in docs), chunk_size=2000)
+    if profile["settings"]:
+        es.indices.put_settings(index=index, settings={"refresh_interval": REFRESH_INTERVAL})
+    es.indices.refresh(index=index)
+    index_seconds = time.perf_counter() - start
+
+    # Index size after merging down to one segment
+    es.indices.forcemerge(index=index, max_num_segments=1)
+    stats = es.indices.stats(index=index, metric="store")
+    size_bytes = stats["indices"][index]["primaries"]["store"]["size_in_bytes"]
+
+    # Query latency (end-to-end and ES 'took')
+    latencies = {}
+    sample_file = docs[0]["filename"] if docs else ""
+    for label, body in query_mix(sample_file, profile["type_facet"]):
+        wall, took = [], []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            res = es.search(index=index, request_cache=False, **body)
+            wall.append((time.perf_counter() - t0) * 1000)
+            took.append(res["took"])
+        latencies[label] = {
+            "p50_ms": round(statistics.median(wall), 2),
+            "p95_ms": round(percentile(wall, 95), 2),
+            "took_p50_ms": statistics.median(took),
+        }
+
+    es.indices.delete(index=index)
+    return {
+        "docs": success,
+        "index_seconds": round(index_seconds, 3),
+        "docs_per_sec": round(success / index_seconds, 1) if index_seconds else None,
+        "store_size_bytes": size_bytes,
+        "queries": latencies,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--es-url', default='http://localhost:9200')
+    parser.add_argument('--excel-dir', default=DEFAULT_EXCEL_DIR)
+    parser.add_argument('--copies', type=int, default=100, help='times each workbook is replicated')
+    parser.add_argument('--rounds', type=int, default=30, help='repetitions per query')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    es = Elasticsearch([args.es_url], request_timeout=120)
+    docs = load_documents(args.excel_dir, args.copies)
+    print(f"📄 Benchmarking with {len(docs)} documents")
+
+    results = {name: bench_profile(es, name, profile, docs, args.rounds) for name, profile in PROFILES.items()}
+
+    legacy, tuned = results["legacy"], results["tuned"]
+    results["summary"] = {
+        "size_ratio": round(tuned["store_size_bytes"] / legacy["store_size_bytes"], 3),
+        "throughput_ratio": round(tuned["docs_per_sec"] / legacy["docs_per_sec"], 3),
+    }
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Allocation benchmark for the search response path.
+
+Compares, for one large result page, the previous mapping (full `_source`
+with the embedding vector, one 12-key dict per hit) with the current one
+(`_source` projected to SOURCE_FIELDS, hit metadata trimmed by filter_path,
+one ResultRow per hit), in the row and columnar shapes. Each variant
+decodes an ES response body with the stdlib json module (as the
+Elasticsearch client does), maps the hits and serializes the response;
+allocations are measured with tracemalloc in a separate pass from timing.
+
+    python -m benchmarks.result_memory --files 20 --rows 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_workbooks
+from embeddings import EMBEDDING_DIMS, VECTOR_FIELD
+from excel_documents import build_documents
+from result_rows import ResultRow, SOURCE_FIELDS, to_columnar_rows
+from wire_format import dumps_bytes
+
+
+def es_response(docs, fields=None):
+    """
+    Serialized search response; with `fields`, `_source` is projected and
+    hit metadata trimmed as Backend's filter_path does
+    """
+    if fields is None:
+        hits = [{"_index": "excel_fields_data", "_id": str(i), "_score": 1.0, "_source": doc}
+                for i, doc in enumerate(docs)]
+    else:
+        hits = [{"_score": 1.0, "_source": {f: doc[f] for f in fields if f in doc}} for doc in docs]
+    return json.dumps({"took": 1, "hits": {"total": {"value": len(hits), "relation": "eq"}, "hits": hits}})
+
+
+def legacy_body(raw):
+    """Full _source and a dict per hit, as search_excel did before"""
+    results = []
+    for hit in json.loads(raw)['hits']['hits']:
+        doc = hit['_source']
+        results.append({
+            'fieldName': doc.get('field_name', ''),
+            'description': doc.get('description', ''),
+            'fieldType': doc.get('field_type', ''),
+            'format': doc.get('format', ''),
+            'fieldLength': doc.get('field_length', ''),
+            'defaultValue': doc.get('default_value', ''),
+            'validValues': doc.get('valid_values', ''),
+            'fieldBehaviour': doc.get('field_behaviour', ''),
+            'visibilityRules': doc.get('visibility_rules', ''),
+            'visibilityAttributes': doc.get('visibility_attributes', ''),
+            'sourceFile': doc.get('filename', ''),
+            'rowNumber': doc.get('row_number', '')
+        })
+    return dumps_bytes({"results": results})
+
+
+def row_body(raw):
+    results = [ResultRow.from_source(hit['_source']) for hit in json.loads(raw)['hits']['hits']]
+    return dumps_bytes({"results": results})
+
+
+def columnar_body(raw):
+    results = [ResultRow.from_source(hit['_source']) for hit in json.loads(raw)['hits']['hits']]
+    return dumps_bytes(to_columnar_rows(results))
+
+
+def measure(fn, raw, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = fn(raw)
+        samples.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_alloc_bytes": peak,
+        "median_ms": round(sorted(samples)[len(samples) // 2], 3),
+        "response_bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--vector-dims', type=int, default=EMBEDDING_DIMS,
+                        help='size of the stored embedding (0: index without vectors)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='excel_bench_')
+    docs = []
+    for path in generate_workbooks(workdir, args.files, args.rows, 1, args.seed):
+        docs.extend(build_documents(pd.read_excel(path), os.path.basename(path)))
+    rng = random.Random(args.seed)
+    if args.vector_dims:
+        for doc in docs:
+            doc[VECTOR_FIELD] = [rng.uniform(-1, 1) for _ in range(args.vector_dims)]
+
+    full, projected = es_response(docs), es_response(docs, SOURCE_FIELDS)
+    report = {
+        "hits": len(docs),
+        "es_response_bytes": {"full_source": len(full), "projected": len(projected)},
+        "dict_full_source": measure(legacy_body, full, args.rounds),
+        "row_projected": measure(row_body, projected, args.rounds),
+        "columnar_projected": measure(columnar_body, projected, args.rounds),
+    }
+    baseline = report["dict_full_source"]["peak_alloc_bytes"]
+    for name in ("row_projected", "columnar_projected"):
+        report[name]["peak_vs_dict_full_source"] = round(report[name]["peak_alloc_bytes"] / baseline, 3)
+
+    print(json.dumps(report, indent=2))
+    ok = report["row_projected"]["peak_vs_dict_full_source"] < 1.0
+    print("✅ Lean path allocates less" if ok else "❌ Lean path allocates more than the dict path")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Reproducible search and ingestion benchmarks on synthetic workbooks.
+
+    python -m benchmarks.run --files 20 --rows 500 --output bench.json
+    python -m benchmarks.run --es-url http://localhost:9200   # use a real cluster
+
+Measures:
+  - parse throughput (pd.read_excel on the first sheet, as the indexers do)
+  - indexing docs/sec (real Elasticsearch only)
+  - Backend.search_excel p50/p99 per query mix, against a scratch index on a
+    real cluster or the in-memory stand-in
+  - server/app.py search_excel p50/p99 (reads the synthetic workbooks directly)
+  - tracemalloc peak per phase and process max RSS
+
+Results are written as JSON, tagged with the git commit, so runs can be
+compared between commits.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.stand_in import StandInElasticsearch
+from benchmarks.synthetic import generate_workbooks
+from excel_documents import build_documents
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_INDEX = 'excel_fields_data_bench'
+
+# Representative request bodies for POST /api/search-excel
+QUERY_MIXES = {
+    "browse_all": [{}],
+    "field_name": [{"fieldName": "id"}, {"fieldName": "date"}, {"fieldName": "email"}],
+    "field_type": [{"fieldType": "string"}, {"fieldType": "date"}],
+    "file_scoped": [{"fileName": "Customer_Fields_0000", "fieldName": "name"}],
+    "combined": [{"fieldName": "status", "fieldType": "dropdown", "visibilityAttributes": "internal"}],
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(samples_ms):
+    return {
+        "n": len(samples_ms),
+        "p50_ms": round(statistics.median(samples_ms), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "mean_ms": round(statistics.fmean(samples_ms), 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+class Phase:
+    """
+    Wall time, and optionally tracemalloc peak, for one benchmark phase.
+    tracemalloc slows allocation-heavy code several-fold, so timings and
+    memory peaks are taken in separate passes.
+    """
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.peak_bytes = None
+
+    def __enter__(self):
+        if self.trace:
+            tracemalloc.start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        if self.trace:
+            _, self.peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+
+def _parse_all(paths):
+    docs, rows = [], 0
+    for path in paths:
+        name = os.path.basename(path)
+        df = pd.read_excel(path)
+        rows += len(df)
+        docs.extend(build_documents(df, name))
+    return docs, rows
+
+
+def bench_parse(paths):
+    total_bytes = sum(os.path.getsize(p) for p in paths)
+    with Phase() as phase:
+        docs, rows = _parse_all(paths)
+    with Phase(trace=True) as memory:
+        _parse_all(paths)
+    return docs, {
+        "files": len(paths),
+        "rows": rows,
+        "seconds": round(phase.seconds, 3),
+        "rows_per_sec": round(rows / phase.seconds, 1),
+        "mb_per_sec": round(total_bytes / 1e6 / phase.seconds, 3),
+        "peak_alloc_bytes": memory.peak_bytes,
+    }
+
+
+def bench_indexing(es, docs):
+    from elasticsearch import helpers
+    from index_template import create_index, begin_bulk_load, end_bulk_load
+
+    create_index(es, BENCH_INDEX, recreate=True)
+    begin_bulk_load(es, BENCH_INDEX)
+    with Phase() as phase:
+        success, _ = helpers.bulk(
+            es, ({"_index": BENCH_INDEX, "_source": d} for d in docs), chunk_size=2000
+        )
+        end_bulk_load(es, BENCH_INDEX)
+    return {
+        "docs": success,
+        "seconds": round(phase.seconds, 3),
+        "docs_per_sec": round(success / phase.seconds, 1),
+    }
+
+
+def bench_api(client, rounds):
+    """p50/p99 of POST /api/search-excel per query mix through a Flask test client"""
+    results = {}
+    for mix, bodies in QUERY_MIXES.items():
+        samples = []
+        for _ in range(rounds):
+            for body in bodies:
+                start = time.perf_counter()
+                response = client.post('/api/search-excel', json=body)
+                samples.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{mix} {body}: HTTP {response.status_code} {response.data[:200]}")
+        results[mix] = summarize(samples)
+
+    # One traced pass over every query for the allocation peak
+    with Phase(trace=True) as memory:
+        for bodies in QUERY_MIXES.values():
+            for body in bodies:
+                client.post('/api/search-excel', json=body)
+    results["peak_alloc_bytes"] = memory.peak_bytes
+    return results
+
+
+def load_backend(es):
+    """Import Backend.py and point it at `es` and the benchmark index"""
+    sys.path.insert(0, ROOT_DIR)
+    import Backend
+    from scatter_gather import SearchBackend
+    Backend.es = es
+    Backend.INDEX_NAME = BENCH_INDEX
+    Backend.INDEX_SETS['default'] = [SearchBackend('default', Backend.ES_URL, BENCH_INDEX)]
+    # Measure the uncached path; repeated bodies would otherwise be cache hits
+    Backend.search_cache.ttl = 0
+    return Backend.app.test_client()
+
+
+def load_file_server(excel_dir):
+    """Import server/app.py and point it at the synthetic workbooks"""
+    spec = importlib.util.spec_from_file_location('server_app', os.path.join(ROOT_DIR, 'server', 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.EXCEL_DIR = excel_dir
+    return module.app.test_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rounds', type=int, default=20, help='repetitions of each query mix')
+    parser.add_argument('--file-server-rounds', type=int, default=3,
+                        help='repetitions for server/app.py, which re-reads every workbook per request')
+    parser.add_argument('--es-url', help='benchmark against this cluster instead of the stand-in')
+    parser.add_argument('--skip-file-server', action='store_true')
+    parser.add_argument('--workdir', help='where to write workbooks (default: temp dir)')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='excel_bench_')
+    paths = generate_workbooks(workdir, args.files, args.rows, 1, args.seed)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {
+            "files": args.files, "rows": args.rows,
+            "seed": args.seed, "rounds": args.rounds,
+            "backend": args.es_url or "stand-in",
+        },
+    }
+
+    docs, report["parse"] = bench_parse(paths)
+    print(f"📄 Parsed {report['parse']['rows']} rows from {len(paths)} workbook(s)")
+
+    if args.es_url:
+        from elasticsearch import Elasticsearch
+        es = Elasticsearch([args.es_url], request_timeout=120)
+        report["indexing"] = bench_indexing(es, docs)
+        print(f"📥 Indexed at {report['indexing']['docs_per_sec']} docs/sec")
+    else:
+        es = StandInElasticsearch(docs)
+        report["indexing"] = {"skipped": "no --es-url given"}
+
+    report["backend_search"] = bench_api(load_backend(es), args.rounds)
+    print("🔍 Backend.py search_excel done")
+
+    if not args.skip_file_server:
+        report["file_server_search"] = bench_api(load_file_server(workdir), args.file_server_rounds)
+        print("🔍 server/app.py search_excel done")
+
+    if args.es_url:
+        es.indices.delete(index=BENCH_INDEX)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["max_rss_bytes"] = maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
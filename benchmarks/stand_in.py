@@ -0,0 +1,83 @@
+"""
+In-memory stand-in for the Elasticsearch client.
+
+Implements the handful of calls Backend.py makes (search/count/ping) over a
+list of documents, with a small evaluator for the query shapes search_excel
+builds. It lets the API path (request parsing, query building, result
+mapping, serialisation) be benchmarked without a cluster; it is not a model
+of Elasticsearch performance.
+"""
+import fnmatch
+import time
+
+
+def _text(doc, field):
+    value = doc.get(field.split('.')[0])
+    return '' if value is None else str(value)
+
+
+def matches(doc, clause):
+    """True if `doc` satisfies the query `clause`"""
+    if not clause or 'match_all' in clause:
+        return True
+    if 'bool' in clause:
+        body = clause['bool']
+        for sub in body.get('must', []) + body.get('filter', []):
+            if not matches(doc, sub):
+                return False
+        should = body.get('should', [])
+        if should:
+            needed = body.get('minimum_should_match', 1 if not body.get('must') else 0)
+            if sum(1 for sub in should if matches(doc, sub)) < needed:
+                return False
+        return True
+    if 'term' in clause:
+        (field, value), = clause['term'].items()
+        value = value.get('value') if isinstance(value, dict) else value
+        return _text(doc, field) == value
+    if 'wildcard' in clause:
+        (field, pattern), = clause['wildcard'].items()
+        pattern = pattern.get('value') if isinstance(pattern, dict) else pattern
+        return fnmatch.fnmatch(_text(doc, field).lower(), pattern.lower())
+    if 'match' in clause:
+        (field, query), = clause['match'].items()
+        query = query.get('query') if isinstance(query, dict) else query
+        tokens = set(_text(doc, field).lower().split())
+        return any(token in tokens for token in str(query).lower().split())
+    # Unknown clause types are treated as matching
+    return True
+
+
+class StandInElasticsearch:
+    """Duck-typed replacement for elasticsearch.Elasticsearch over in-memory docs"""
+
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.search_calls = 0
+
+    def options(self, **kwargs):
+        return self
+
+    def ping(self):
+        return True
+
+    def count(self, index=None, query=None, **kwargs):
+        return {"count": sum(1 for d in self.docs if matches(d, query))}
+
+    def search(self, index=None, query=None, size=10, **kwargs):
+        self.search_calls += 1
+        start = time.perf_counter()
+        hits = [d for d in self.docs if matches(d, query)]
+        took = int((time.perf_counter() - start) * 1000)
+        return {
+            "took": took,
+            "timed_out": False,
+            "hits": {
+                "total": {"value": len(hits), "relation": "eq"},
+                "max_score": 1.0 if hits else None,
+                "hits": [
+                    {"_index": index, "_id": str(i), "_score": 1.0, "_source": d}
+                    for i, d in enumerate(hits[:size])
+                ]
+            }
+        }
@@ -0,0 +1,91 @@
+"""
+Synthetic field-catalog workbooks with the Project_Management_Fields.xlsx schema.
+
+    python -m benchmarks.synthetic --out /tmp/catalog --files 20 --rows 500 --sheets 2
+"""
+import argparse
+import os
+import random
+
+import pandas as pd
+
+from excel_documents import COLUMN_MAP
+
+HEADERS = list(COLUMN_MAP.keys())
+
+DOMAINS = ['Customer', 'Employee', 'Event', 'Inventory', 'Invoice', 'Order',
+           'Product', 'Project', 'Survey', 'User', 'Vendor', 'Shipment']
+NOUNS = ['ID', 'Name', 'Email', 'Phone', 'Address', 'Status', 'Priority', 'Date',
+         'Amount', 'Budget', 'Owner', 'Manager', 'Code', 'Category', 'Notes',
+         'Start Date', 'End Date', 'Quantity', 'Rating', 'Comment']
+FIELD_TYPES = ['String', 'Integer', 'Decimal', 'Date', 'Dropdown', 'Text', 'Boolean', 'Email']
+FORMATS = {
+    'String': ['Alphanumeric', 'Text', 'Reference'],
+    'Integer': ['Number', 'Whole number'],
+    'Decimal': ['Currency', 'Percentage', 'Number'],
+    'Date': ['YYYY-MM-DD', 'DD/MM/YYYY'],
+    'Dropdown': ['List'],
+    'Text': ['Multi-line text'],
+    'Boolean': ['Yes/No'],
+    'Email': ['email@domain.com'],
+}
+VALID_VALUES = ['Non-empty string', 'Valid date', 'Positive numbers', '0-100',
+                'Low, Medium, High', 'Planning, Active, On Hold, Completed',
+                'Valid employee ID', 'Any text', 'Format: PRJ-XXXXX', 'Yes, No']
+BEHAVIOURS = ['Required', 'Optional', 'Auto-generated', 'Read-only', 'Calculated']
+VISIBILITY_RULES = ['Always Visible', 'Visible to Managers', 'Visible when Status is Active',
+                    'Hidden on create', 'Visible to Admins']
+VISIBILITY_ATTRIBUTES = ['Public', 'Internal', 'Confidential', 'Restricted']
+
+
+def make_rows(rng, domain, rows):
+    """`rows` catalog rows for one sheet"""
+    data = []
+    for i in range(rows):
+        noun = rng.choice(NOUNS)
+        field_type = rng.choice(FIELD_TYPES)
+        data.append({
+            'Field Name': f"{domain} {noun}" if i < len(NOUNS) else f"{domain} {noun} {i}",
+            'Description': f"{noun.lower()} of the {domain.lower()} record",
+            'Field Type': field_type,
+            'Format': rng.choice(FORMATS[field_type]),
+            'Field Length': rng.choice([10, 20, 50, 100, 200, 500]),
+            'Default Value': rng.choice([None, None, 'Auto-generated', 'Today', '0', 'Medium']),
+            'Valid Values': rng.choice(VALID_VALUES),
+            'Field Behaviour': rng.choice(BEHAVIOURS),
+            'Visibility Rules': rng.choice(VISIBILITY_RULES),
+            'Visibility Attributes': rng.choice(VISIBILITY_ATTRIBUTES),
+        })
+    return pd.DataFrame(data, columns=HEADERS)
+
+
+def generate_workbooks(out_dir, files=10, rows=100, sheets=1, seed=0):
+    """Write `files` workbooks of `sheets` sheets x `rows` rows; return their paths"""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for n in range(files):
+        domain = DOMAINS[n % len(DOMAINS)]
+        path = os.path.join(out_dir, f"{domain}_Fields_{n:04d}.xlsx")
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            for sheet in range(sheets):
+                make_rows(rng, domain, rows).to_excel(writer, sheet_name=f"Sheet{sheet + 1}", index=False)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--files', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--sheets', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_workbooks(args.out, args.files, args.rows, args.sheets, args.seed)
+    print(f"✓ Wrote {len(paths)} workbook(s) to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
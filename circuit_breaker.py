@@ -0,0 +1,96 @@
+"""
+Circuit breaker for calls to an unreliable dependency (Elasticsearch).
+
+closed     - calls pass through; consecutive failures are counted
+open       - calls fail immediately with CircuitOpenError for `reset_timeout`s
+half_open  - one trial call is let through; success closes, failure re-opens
+
+Only unavailability counts as a failure (see is_unavailable): 5xx and 429
+(rejected execution, tripped ES circuit breakers) mean Elasticsearch cannot
+serve, while any other 4xx means the request was wrong, so it is re-raised
+without touching the breaker.
+"""
+import threading
+import time
+
+from elasticsearch import ApiError, ConnectionError, ConnectionTimeout
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling through while the breaker is open"""
+
+
+def is_unavailable(exc):
+    """True for errors that mean the backend could not serve any request"""
+    if isinstance(exc, (ConnectionError, ConnectionTimeout, CircuitOpenError)):
+        return True
+    return isinstance(exc, ApiError) and (exc.status_code >= 500 or exc.status_code == 429)
+
+
+class CircuitBreaker:
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=15.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _before_call(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"{self.name}: circuit open")
+                self._state = HALF_OPEN
+            # half-open: only one trial call at a time
+            if self._trial_in_flight:
+                raise CircuitOpenError(f"{self.name}: circuit half-open, trial in progress")
+            self._trial_in_flight = True
+
+    def _on_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def _on_client_error(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _on_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, fn, *args, **kwargs):
+        """Call `fn` through the breaker"""
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_unavailable(e):
+                self._on_failure()
+            else:
+                self._on_client_error()
+            raise
+        self._on_success()
+        return result
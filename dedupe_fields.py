@@ -0,0 +1,203 @@
+"""
+Group near-duplicate field definitions across workbooks.
+
+The same logical field (say "Customer Email") is catalogued in many
+workbooks with small variations in name, description and valid values.
+This batch job reads every document of the index, computes a MinHash
+signature over its normalised field_name / description / valid_values,
+finds candidate pairs with LSH banding, confirms them on the estimated
+Jaccard similarity and joins them with union-find. Each resulting group
+gets its own field_cluster_id, written back to the documents whose id
+changed; search_excel can then collapse results on that field.
+
+Cost is roughly linear in the number of documents: one signature per
+document, one bucket insert per band, and each bucket is only compared
+against its first member.
+
+    python dedupe_fields.py                   # compute and write cluster ids
+    python dedupe_fields.py --dry-run --top 20
+"""
+import argparse
+import os
+import time
+import zlib
+from collections import Counter, defaultdict
+
+import numpy as np
+from elasticsearch import Elasticsearch, helpers
+
+from excel_documents import default_cluster_id, normalize_text
+from index_template import INDEX_NAME
+
+ES_URL = os.environ.get('ES_URL', 'http://localhost:9200')
+
+# 16 bands x 4 rows: pairs above ~0.5 Jaccard are very likely to share a bucket
+LSH_BANDS = int(os.environ.get('DEDUPE_LSH_BANDS', 16))
+LSH_ROWS = int(os.environ.get('DEDUPE_LSH_ROWS', 4))
+SIMILARITY_THRESHOLD = float(os.environ.get('DEDUPE_THRESHOLD', 0.6))
+SEED = 1
+
+_PRIME = (1 << 31) - 1
+SOURCE_FIELDS = ['field_name', 'description', 'valid_values', 'filename', 'row_number', 'field_cluster_id']
+
+
+def shingles(doc):
+    """
+    Feature set of a document: character 3-grams of the field name (so
+    'cust email' and 'customer email' overlap) plus description and
+    valid-values words, prefixed so the sources do not mix.
+    """
+    features = set()
+    name = normalize_text(doc.get('field_name')).replace(' ', '')
+    features.update('n:' + name[i:i + 3] for i in range(max(len(name) - 2, 1)))
+    features.update('d:' + word for word in normalize_text(doc.get('description')).split())
+    features.update('v:' + word for word in normalize_text(doc.get('valid_values')).split())
+    features.discard('n:')
+    return features
+
+
+class MinHasher:
+    """Universal-hash MinHash with `num_perm` permutations"""
+
+    def __init__(self, num_perm, seed=SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, features):
+        if not features:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint32)
+        x = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint64, count=len(features))
+        hashed = (np.outer(x, self.a) + self.b) % _PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+
+class UnionFind:
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.size[i] += self.size[j]
+
+
+def cluster(docs, bands=LSH_BANDS, rows=LSH_ROWS, threshold=SIMILARITY_THRESHOLD):
+    """
+    Cluster id for each of `docs` (list of _source dicts), in order.
+    A group takes the ingestion-time id of its first member by filename and
+    row, so every group has a distinct id, ids stay stable while membership
+    does, and singletons keep their default id. Documents with no text at
+    all are never grouped.
+    """
+    hasher = MinHasher(bands * rows)
+    signatures = np.empty((len(docs), bands * rows), dtype=np.uint32)
+    candidates = []
+    for i, doc in enumerate(docs):
+        features = shingles(doc)
+        signatures[i] = hasher.signature(features)
+        if features:
+            candidates.append(i)
+
+    groups = UnionFind(len(docs))
+    for band in range(bands):
+        buckets = {}
+        band_slice = signatures[:, band * rows:(band + 1) * rows]
+        for i in candidates:
+            key = band_slice[i].tobytes()
+            first = buckets.setdefault(key, i)
+            if first != i and groups.find(first) != groups.find(i):
+                if np.mean(signatures[first] == signatures[i]) >= threshold:
+                    groups.union(first, i)
+
+    members = defaultdict(list)
+    for i in range(len(docs)):
+        members[groups.find(i)].append(i)
+
+    def row_key(i):
+        return str(docs[i].get('filename') or ''), docs[i].get('row_number') or 0
+
+    cluster_ids = [None] * len(docs)
+    for indices in members.values():
+        first = docs[min(indices, key=row_key)]
+        name = default_cluster_id(first.get('filename'), first.get('row_number'))
+        for i in indices:
+            cluster_ids[i] = name
+    return cluster_ids
+
+
+def run(es, index_name=INDEX_NAME, dry_run=False, top=0, **cluster_kwargs):
+    """Cluster the whole index and write back changed ids; returns counts"""
+    started = time.perf_counter()
+    ids, indices, docs = [], [], []
+    for hit in helpers.scan(es, index=index_name, query={"query": {"match_all": {}}, "_source": SOURCE_FIELDS}, size=2000):
+        ids.append(hit['_id'])
+        indices.append(hit['_index'])
+        docs.append(hit['_source'])
+    print(f"📥 Read {len(docs)} documents in {time.perf_counter() - started:.1f}s")
+
+    cluster_started = time.perf_counter()
+    cluster_ids = cluster(docs, **cluster_kwargs)
+    sizes = Counter(cluster_ids)
+    print(f"🧮 {len(sizes)} clusters ({sum(1 for n in sizes.values() if n > 1)} with duplicates) "
+          f"in {time.perf_counter() - cluster_started:.1f}s")
+
+    if top:
+        examples = {}
+        for doc, cid in zip(docs, cluster_ids):
+            examples.setdefault(cid, []).append(f"{doc.get('field_name')} ({doc.get('filename')})")
+        for cid, n in sizes.most_common(top):
+            print(f"   {cid}  x{n}: " + "; ".join(examples[cid][:5]) + (" ..." if n > 5 else ""))
+
+    actions = [
+        {"_op_type": "update", "_index": index, "_id": doc_id, "doc": {"field_cluster_id": cid}}
+        for doc_id, index, doc, cid in zip(ids, indices, docs, cluster_ids)
+        if doc.get('field_cluster_id') != cid
+    ]
+    print(f"✏️  {len(actions)} document(s) changed cluster")
+    if dry_run or not actions:
+        return {"documents": len(docs), "clusters": len(sizes), "updated": 0}
+
+    success, failed = helpers.bulk(es, actions, raise_on_error=False)
+    es.indices.refresh(index=index_name)
+    if failed:
+        print(f"   ✗ Failed: {len(failed)} updates")
+    return {"documents": len(docs), "clusters": len(sizes), "updated": success}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--index', default=INDEX_NAME)
+    parser.add_argument('--bands', type=int, default=LSH_BANDS)
+    parser.add_argument('--rows', type=int, default=LSH_ROWS)
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument('--dry-run', action='store_true', help='report clusters without writing')
+    parser.add_argument('--top', type=int, default=0, help='print the N largest clusters')
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("🔗 FIELD DEDUPLICATION")
+    print("="*70)
+    es = Elasticsearch([ES_URL], request_timeout=120)
+    result = run(es, args.index, dry_run=args.dry_run, top=args.top,
+                 bands=args.bands, rows=args.rows, threshold=args.threshold)
+    print(f"✅ Done: {result}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Local sentence embeddings for semantic field search.
+
+A small CPU-friendly model (all-MiniLM-L6-v2 by default, 384 dimensions)
+embeds "field_name: description" for each catalog row at index time and
+the search text at query time. Vectors are L2-normalised, so the
+dense_vector field uses dot_product similarity.
+
+sentence-transformers is optional: without it `available()` is False, the
+indexer skips the vector field and search_excel rejects semantic modes.
+"""
+import os
+import threading
+from functools import lru_cache
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # keyword search only
+    SentenceTransformer = None
+
+EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+EMBEDDING_DIMS = int(os.environ.get('EMBEDDING_DIMS', 384))
+EMBEDDING_BATCH_SIZE = int(os.environ.get('EMBEDDING_BATCH_SIZE', 64))
+EMBEDDINGS_ENABLED = os.environ.get('EMBEDDINGS_ENABLED', '1') == '1'
+# Intra-op threads per process; gunicorn runs one model per worker
+EMBEDDING_THREADS = int(os.environ.get('EMBEDDING_THREADS', 1))
+
+VECTOR_FIELD = 'field_vector'
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def available():
+    return EMBEDDINGS_ENABLED and SentenceTransformer is not None
+
+
+def limit_threads(threads=EMBEDDING_THREADS):
+    """Cap torch's CPU thread pool so workers x threads stays within the cores"""
+    if not available():
+        return
+    import torch
+    torch.set_num_threads(threads)
+
+
+def get_model():
+    """The embedding model, loaded once per process"""
+    global _model
+    if not available():
+        raise RuntimeError("Embeddings are unavailable (install sentence-transformers or set EMBEDDINGS_ENABLED=1)")
+    with _model_lock:
+        if _model is None:
+            _model = SentenceTransformer(EMBEDDING_MODEL, device='cpu')
+        return _model
+
+
+def embedding_text(doc):
+    """Text embedded for a catalog row: the field name plus its description"""
+    name = doc.get('field_name') or ''
+    description = doc.get('description') or ''
+    return f"{name}: {description}" if description else name
+
+
+def encode(texts, batch_size=EMBEDDING_BATCH_SIZE):
+    """Normalised embeddings for `texts`, as lists of floats"""
+    if not texts:
+        return []
+    vectors = get_model().encode(
+        list(texts),
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+    return vectors.tolist()
+
+
+def add_embeddings(docs, batch_size=EMBEDDING_BATCH_SIZE):
+    """Set VECTOR_FIELD on each doc (in place); rows with no text get none"""
+    docs = [doc for doc in docs if embedding_text(doc)]
+    for start in range(0, len(docs), batch_size):
+        chunk = docs[start:start + batch_size]
+        for doc, vector in zip(chunk, encode([embedding_text(d) for d in chunk], batch_size)):
+            doc[VECTOR_FIELD] = vector
+
+
+@lru_cache(maxsize=1024)
+def _encode_query(text):
+    return tuple(encode([text])[0])
+
+
+def encode_query(text):
+    """Embedding for a search string; repeated queries skip the model"""
+    return list(_encode_query(text.strip().lower()))
@@ -0,0 +1,79 @@
+"""
+Turn field-catalog workbooks into Elasticsearch documents.
+
+Shared by the OneDrive indexer and the benchmarks so both build exactly
+the same documents.
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import embeddings
+
+# Excel header -> Elasticsearch field
+COLUMN_MAP = {
+    'Field Name': 'field_name',
+    'Description': 'description',
+    'Field Type': 'field_type',
+    'Format': 'format',
+    'Field Length': 'field_length',
+    'Default Value': 'default_value',
+    'Valid Values': 'valid_values',
+    'Field Behaviour': 'field_behaviour',
+    'Visibility Rules': 'visibility_rules',
+    'Visibility Attributes': 'visibility_attributes',
+}
+
+
+def clean_value(value):
+    """Clean cell values"""
+    if pd.isna(value):
+        return None
+    return str(value).strip()
+
+
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(value):
+    """'CustEmail', 'cust_email' and 'Cust Email' all become 'cust email'"""
+    if not value:
+        return ''
+    value = _CAMEL_BOUNDARY.sub(' ', str(value))
+    return ' '.join(_NON_ALNUM.sub(' ', value.lower()).split())
+
+
+def default_cluster_id(filename, row_number):
+    """
+    Cluster id of a single row: every row is its own cluster until
+    dedupe_fields.py groups near-duplicates, so nothing is collapsed before.
+    """
+    return hashlib.blake2b(f"{filename}#{row_number}".encode(), digest_size=8).hexdigest()
+
+
+def build_documents(df, filename, indexed_at=None):
+    """Yield one document per worksheet row"""
+    indexed_at = indexed_at or datetime.now(timezone.utc).isoformat()
+    for idx, row in df.iterrows():
+        doc = {es_field: clean_value(row.get(header)) for header, es_field in COLUMN_MAP.items()}
+        doc['filename'] = filename
+        doc['row_number'] = idx + 2  # +2 because Excel row 1 is header
+        doc['indexed_at'] = indexed_at
+        doc['field_cluster_id'] = default_cluster_id(filename, doc['row_number'])
+        yield doc
+
+
+def build_actions(df, filename, index_name, embed=None):
+    """
+    Bulk actions for helpers.bulk(). With `embed` (default: whenever the
+    embedding model is available) each document carries its vector.
+    """
+    docs = list(build_documents(df, filename))
+    if embed is None:
+        embed = embeddings.available()
+    if embed:
+        embeddings.add_embeddings(docs)
+    return [{"_index": index_name, "_source": doc} for doc in docs]
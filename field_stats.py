@@ -0,0 +1,203 @@
+"""
+Per-file and global summaries of the field catalog.
+
+Summaries are computed by the indexer while it already has each workbook in
+memory, stored in a small summary index, and served by Backend.py from an
+in-process cache so /api/stats never aggregates over the main index.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from excel_documents import COLUMN_MAP, clean_value
+
+SUMMARY_INDEX = 'excel_fields_summary'
+GLOBAL_ID = '_global'
+MAX_DISTINCT_VALID_VALUES = 200
+
+SUMMARY_MAPPINGS = {
+    "dynamic": "false",
+    "properties": {
+        "scope": {"type": "keyword"},
+        "filename": {"type": "keyword"},
+        "row_count": {"type": "integer"},
+        "computed_at": {"type": "date"},
+        # Served verbatim, never searched
+        "field_types": {"type": "object", "enabled": False},
+        "null_counts": {"type": "object", "enabled": False},
+        "null_rates": {"type": "object", "enabled": False},
+        "valid_values": {"type": "object", "enabled": False},
+        "distinct_valid_values": {"type": "integer"}
+    }
+}
+
+
+def _null_rates(null_counts, row_count):
+    if not row_count:
+        return {col: 0.0 for col in null_counts}
+    return {col: round(n / row_count, 4) for col, n in null_counts.items()}
+
+
+def summarize_dataframe(df, filename):
+    """Summary for one workbook, computed from the DataFrame read at ingestion"""
+    row_count = len(df)
+    null_counts = {}
+    for header, es_field in COLUMN_MAP.items():
+        if header in df.columns:
+            null_counts[es_field] = int(df[header].isna().sum())
+        else:
+            null_counts[es_field] = row_count
+
+    field_types = Counter()
+    if 'Field Type' in df.columns:
+        for value in df['Field Type']:
+            field_types[clean_value(value) or '(empty)'] += 1
+
+    valid_values = set()
+    if 'Valid Values' in df.columns:
+        for value in df['Valid Values']:
+            value = clean_value(value)
+            if value:
+                valid_values.add(value)
+
+    return {
+        "scope": "file",
+        "filename": filename,
+        "row_count": row_count,
+        "field_types": dict(field_types),
+        "null_counts": null_counts,
+        "null_rates": _null_rates(null_counts, row_count),
+        "valid_values": sorted(valid_values)[:MAX_DISTINCT_VALID_VALUES],
+        "distinct_valid_values": len(valid_values),
+        "computed_at": datetime.now().isoformat()
+    }
+
+
+def merge_summaries(summaries):
+    """Global summary across all per-file summaries"""
+    row_count = 0
+    field_types = Counter()
+    null_counts = Counter()
+    valid_values = set()
+    for summary in summaries:
+        row_count += summary["row_count"]
+        field_types.update(summary["field_types"])
+        null_counts.update(summary["null_counts"])
+        valid_values.update(summary["valid_values"])
+
+    return {
+        "scope": "global",
+        "filename": None,
+        "file_count": len(summaries),
+        "row_count": row_count,
+        "field_types": dict(field_types),
+        "null_counts": dict(null_counts),
+        "null_rates": _null_rates(null_counts, row_count),
+        "valid_values": sorted(valid_values)[:MAX_DISTINCT_VALID_VALUES],
+        # Lower bound once per-file lists have been truncated
+        "distinct_valid_values": len(valid_values),
+        "computed_at": datetime.now().isoformat()
+    }
+
+
+def store_summaries(es, summaries, index_name=SUMMARY_INDEX):
+    """Replace the summary index with `summaries` plus a global roll-up"""
+    if es.indices.exists(index=index_name):
+        es.indices.delete(index=index_name)
+    es.indices.create(index=index_name, mappings=SUMMARY_MAPPINGS)
+
+    for summary in summaries:
+        es.index(index=index_name, id=summary["filename"], document=summary)
+    es.index(index=index_name, id=GLOBAL_ID, document=merge_summaries(summaries))
+    es.indices.refresh(index=index_name)
+
+
+def _refresh_global(es, index_name):
+    result = es.search(index=index_name, query={"term": {"scope": "file"}}, size=10000)
+    files = [hit["_source"] for hit in result["hits"]["hits"]]
+    es.index(index=index_name, id=GLOBAL_ID, document=merge_summaries(files), refresh=True)
+
+
+def upsert_file_summary(es, summary, index_name=SUMMARY_INDEX):
+    """Replace one file's summary and recompute the global roll-up"""
+    if not es.indices.exists(index=index_name):
+        es.indices.create(index=index_name, mappings=SUMMARY_MAPPINGS)
+    es.index(index=index_name, id=summary["filename"], document=summary, refresh=True)
+    _refresh_global(es, index_name)
+
+
+def delete_file_summary(es, filename, index_name=SUMMARY_INDEX):
+    """Drop one file's summary and recompute the global roll-up"""
+    if not es.indices.exists(index=index_name):
+        return
+    es.options(ignore_status=404).delete(index=index_name, id=filename, refresh=True)
+    _refresh_global(es, index_name)
+
+
+class StatsCache:
+    """
+    In-process copy of the summary index.
+
+    The whole index is a handful of small documents, so it is loaded in one
+    request and every lookup afterwards is a dict access. It reloads when
+    older than `ttl` seconds. A failed reload is not retried for
+    `retry_after` seconds: meanwhile lookups get the last good copy, or the
+    load error again if there is none. `on_access(hit)` is called on every
+    lookup, with hit=False when the lookup had to reload.
+    """
+
+    def __init__(self, es, index_name=SUMMARY_INDEX, ttl=300, on_access=None, retry_after=30):
+        self.es = es
+        self.index_name = index_name
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.on_access = on_access
+        self._lock = threading.Lock()
+        self._global = None
+        self._files = {}
+        self._loaded_at = None
+        self._failed_at = None
+        self._error = None
+
+    def load(self):
+        result = self.es.search(index=self.index_name, query={"match_all": {}}, size=10000)
+        files, global_summary = {}, None
+        for hit in result["hits"]["hits"]:
+            if hit["_id"] == GLOBAL_ID:
+                global_summary = hit["_source"]
+            else:
+                files[hit["_id"]] = hit["_source"]
+        with self._lock:
+            self._files = files
+            self._global = global_summary
+            self._loaded_at = time.monotonic()
+            self._failed_at = self._error = None
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        stale = self._loaded_at is None or now - self._loaded_at > self.ttl
+        backing_off = self._failed_at is not None and now - self._failed_at < self.retry_after
+        reload = stale and not backing_off
+        if reload:
+            try:
+                self.load()
+            except Exception as e:
+                with self._lock:
+                    self._failed_at, self._error = time.monotonic(), e
+        if self.on_access is not None:
+            self.on_access(not reload)
+        if self._loaded_at is None and self._error is not None:
+            raise self._error
+
+    def global_summary(self):
+        self._ensure_fresh()
+        return self._global
+
+    def file_summary(self, filename):
+        self._ensure_fresh()
+        return self._files.get(filename)
+
+    def file_summaries(self):
+        self._ensure_fresh()
+        return list(self._files.values())
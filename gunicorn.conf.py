@@ -0,0 +1,66 @@
+"""
+Production serving for Backend.py.
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/excel-search-metrics gunicorn -c gunicorn.conf.py
+
+Backend.py is a WSGI (Flask) app, so it runs under gunicorn's preforking
+workers rather than an ASGI server. Workers default to one per core, each
+with a few threads since most request time is spent waiting on
+Elasticsearch; every worker loads its own embedding model, limited to
+EMBEDDING_THREADS torch threads (see Backend.init_worker).
+"""
+import multiprocessing
+import os
+import shutil
+
+wsgi_app = 'Backend:app'
+
+bind = os.environ.get('BIND', '0.0.0.0:3001')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import the app once in the master so workers fork with code already loaded;
+# per-worker state (ES client, caches) is rebuilt in post_fork
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+WARM_CACHES = os.environ.get('WARM_CACHES', '1') == '1'
+
+
+def on_starting(server):
+    # Stale per-worker metric files from a previous run would be summed in
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    import Backend
+    Backend.init_worker()
+
+
+def post_worker_init(worker):
+    # Warm in the background: model loads, workbook parsing and warm queries
+    # can take longer than `timeout`, and the worker only starts heartbeating
+    # once this hook returns. Requests arriving meanwhile just miss the cache.
+    if WARM_CACHES:
+        import threading
+        import Backend
+        threading.Thread(target=Backend.warm_caches, name='warm-caches', daemon=True).start()
+
+
+def child_exit(server, worker):
+    from observability import mark_worker_dead
+    mark_worker_dead(worker.pid)
@@ -0,0 +1,136 @@
+"""
+Declarative index settings and mappings for the field-catalog index.
+
+The catalog is small, read-mostly and filtered rather than ranked, so:
+  - one primary shard (a few thousand docs do not benefit from more),
+  - best_compression codec for stored fields,
+  - norms disabled everywhere (no length normalisation needed for filters),
+  - index_options 'docs' on columns that are only ever matched, never scored,
+  - keyword subfields with doc_values on the columns we facet on.
+
+The one ranked path is semantic search: field_vector holds a normalised
+embedding of field_name + description in an HNSW graph (see embeddings.py).
+"""
+import os
+
+from embeddings import EMBEDDING_DIMS, VECTOR_FIELD
+
+INDEX_NAME = 'excel_fields_data'
+TEMPLATE_NAME = 'excel_fields_template'
+INDEX_PATTERNS = [f"{INDEX_NAME}*"]
+
+NUMBER_OF_SHARDS = int(os.environ.get('ES_NUMBER_OF_SHARDS', 1))
+# One replica for production clusters; single-node dev sets ES_NUMBER_OF_REPLICAS=0
+NUMBER_OF_REPLICAS = int(os.environ.get('ES_NUMBER_OF_REPLICAS', 1))
+REFRESH_INTERVAL = os.environ.get('ES_REFRESH_INTERVAL', '30s')
+
+# HNSW graph parameters: m = links per node, ef_construction = build-time beam
+HNSW_M = int(os.environ.get('ES_HNSW_M', 16))
+HNSW_EF_CONSTRUCTION = int(os.environ.get('ES_HNSW_EF_CONSTRUCTION', 100))
+
+
+def _text(index_options='docs', keyword=False):
+    """Text column with scoring features switched off"""
+    field = {"type": "text", "norms": False, "index_options": index_options}
+    if keyword:
+        field["fields"] = {
+            "keyword": {"type": "keyword", "ignore_above": 256, "doc_values": True}
+        }
+    return field
+
+
+def _keyword(doc_values=True):
+    return {"type": "keyword", "doc_values": doc_values}
+
+
+INDEX_SETTINGS = {
+    "number_of_shards": NUMBER_OF_SHARDS,
+    "number_of_replicas": NUMBER_OF_REPLICAS,
+    "refresh_interval": REFRESH_INTERVAL,
+    "codec": "best_compression",
+}
+
+# Settings applied while a bulk load is running and restored afterwards
+BULK_LOAD_SETTINGS = {
+    "refresh_interval": "-1",
+    "number_of_replicas": 0,
+}
+
+INDEX_MAPPINGS = {
+    "dynamic": "false",
+    "properties": {
+        # Free-text columns; keep positions on the two we may phrase-match
+        "field_name": _text(index_options='positions', keyword=True),
+        "description": _text(index_options='positions'),
+        "field_type": _text(keyword=True),
+        "format": _text(keyword=True),
+        "field_length": _text(),
+        "default_value": _text(),
+        "valid_values": _text(),
+        "field_behaviour": _text(keyword=True),
+        "visibility_rules": _text(keyword=True),
+        "visibility_attributes": _text(keyword=True),
+
+        # Embedding of field_name + description for kNN search
+        VECTOR_FIELD: {
+            "type": "dense_vector",
+            "dims": EMBEDDING_DIMS,
+            "index": True,
+            "similarity": "dot_product",
+            "index_options": {"type": "hnsw", "m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION}
+        },
+
+        # Metadata
+        "filename": _keyword(),
+        "row_number": {"type": "integer"},
+        "indexed_at": {"type": "date"},
+
+        # Near-duplicate group across workbooks (dedupe_fields.py), for collapse
+        "field_cluster_id": _keyword()
+    }
+}
+
+
+def index_body():
+    """Settings + mappings in the shape expected by indices.create()"""
+    return {"settings": INDEX_SETTINGS, "mappings": INDEX_MAPPINGS}
+
+
+def put_index_template(es):
+    """
+    Register a composable index template so that every excel_fields_data*
+    index (e.g. one per business unit) picks up the same profile.
+    """
+    es.indices.put_index_template(
+        name=TEMPLATE_NAME,
+        index_patterns=INDEX_PATTERNS,
+        template=index_body(),
+        priority=100
+    )
+
+
+def create_index(es, index_name=INDEX_NAME, recreate=True):
+    """Create `index_name` with the tuned profile, optionally dropping it first"""
+    if es.indices.exists(index=index_name):
+        if not recreate:
+            return False
+        es.indices.delete(index=index_name)
+    es.indices.create(index=index_name, settings=INDEX_SETTINGS, mappings=INDEX_MAPPINGS)
+    return True
+
+
+def begin_bulk_load(es, index_name=INDEX_NAME):
+    """Turn off refresh and replicas for the duration of a bulk load"""
+    es.indices.put_settings(index=index_name, settings=BULK_LOAD_SETTINGS)
+
+
+def end_bulk_load(es, index_name=INDEX_NAME):
+    """Restore the steady-state refresh interval and replica count"""
+    es.indices.put_settings(
+        index=index_name,
+        settings={
+            "refresh_interval": REFRESH_INTERVAL,
+            "number_of_replicas": NUMBER_OF_REPLICAS,
+        }
+    )
+    es.indices.refresh(index=index_name)
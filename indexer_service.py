@@ -0,0 +1,561 @@
+"""
+Long-running indexer that keeps excel_fields_data fresh between full crawls.
+
+Change sources:
+  - a watchdog observer on server/excel-files (create/modify/move/delete)
+  - a Microsoft Graph change-notification webhook for the OneDrive folder;
+    a notification only says "the drive changed", so each batch runs one
+    Graph delta query and re-indexes just the workbooks it reports
+
+Events are debounced and coalesced into micro-batches (a workbook saved ten
+times in a second is re-indexed once), then only the affected workbooks are
+re-indexed. The Graph delta link and the item-id -> filename map are kept in
+the excel_fields_sync_state index so restarts resume where they stopped.
+
+    python indexer_service.py run                  # watcher + webhook on :3002
+    python indexer_service.py simulate FILE...      # feed local change events
+    python indexer_service.py simulate --graph      # feed one Graph notification
+"""
+import argparse
+import io
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import requests
+from elasticsearch import Elasticsearch, helpers
+from flask import Flask, request
+
+from excel_documents import build_actions
+from field_stats import summarize_dataframe, upsert_file_summary, delete_file_summary
+from index_template import INDEX_NAME
+
+ES_URL = os.environ.get('ES_URL', 'http://localhost:9200')
+WATCH_DIR = os.environ.get(
+    'WATCH_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server', 'excel-files')
+)
+DEBOUNCE_SECONDS = float(os.environ.get('INDEXER_DEBOUNCE', 2.0))
+MAX_BATCH_DELAY = float(os.environ.get('INDEXER_MAX_DELAY', 10.0))
+MAX_RETRIES = int(os.environ.get('INDEXER_MAX_RETRIES', 5))
+WEBHOOK_PORT = int(os.environ.get('INDEXER_WEBHOOK_PORT', 3002))
+
+ONEDRIVE_FOLDER = os.environ.get('ONEDRIVE_FOLDER', 'Excel')
+GRAPH_URL = 'https://graph.microsoft.com/v1.0'
+GRAPH_CLIENT_STATE = os.environ.get('GRAPH_CLIENT_STATE', '')
+GRAPH_NOTIFICATION_URL = os.environ.get('GRAPH_NOTIFICATION_URL', '')
+SUBSCRIPTION_MINUTES = 2 * 24 * 60  # renewed well before OneDrive's ~30 day limit
+
+SYNC_STATE_INDEX = 'excel_fields_sync_state'
+SYNC_STATE_ID = 'onedrive'
+
+LOCAL, GRAPH = 'local', 'graph'
+UPSERT, DELETE = 'upsert', 'delete'
+
+
+def is_workbook(name):
+    base = os.path.basename(name)
+    return base.lower().endswith(('.xlsx', '.xls')) and not base.startswith('~$')
+
+
+# ============ MICRO-BATCHING ============
+
+class MicroBatcher:
+    """
+    Coalesces events per key and hands them to `handler(batch)` once no new
+    event has arrived for `quiet` seconds, or `max_delay` seconds after the
+    first pending event, whichever comes first. Later events for a key
+    replace earlier ones, so a batch holds only the latest action per key.
+    """
+
+    def __init__(self, handler, quiet=DEBOUNCE_SECONDS, max_delay=MAX_BATCH_DELAY, clock=time.monotonic):
+        self.handler = handler
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._first_at = None
+        self._last_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, key, action, replace=True):
+        """Queue `action` for `key`; with replace=False a pending action wins"""
+        with self._lock:
+            now = self.clock()
+            if replace or key not in self._pending:
+                self._pending[key] = action
+            if self._first_at is None:
+                self._first_at = now
+            self._last_at = now
+
+    def _take_due(self, force=False):
+        with self._lock:
+            if not self._pending:
+                return None
+            now = self.clock()
+            if not force and now - self._last_at < self.quiet and now - self._first_at < self.max_delay:
+                return None
+            batch, self._pending = self._pending, {}
+            self._first_at = self._last_at = None
+            return batch
+
+    def flush_due(self, force=False):
+        """Run the handler if a batch is due; returns the batch or None"""
+        batch = self._take_due(force)
+        if batch:
+            self.handler(batch)
+        return batch
+
+    def start(self, interval=0.25):
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush_due()
+                except Exception as e:
+                    print(f"❌ Batch failed: {e}")
+        self._thread = threading.Thread(target=loop, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush_due(force=True)
+
+
+# ============ INDEXING ============
+
+def index_workbook(es, df, filename):
+    """
+    Replace one workbook's documents without a window where it has none:
+    write the new rows, then delete rows for this file from earlier runs.
+    If any row fails to index the old rows are kept and BulkIndexError is
+    raised, so the caller can retry the workbook. Returns the rows indexed.
+    """
+    actions = build_actions(df, filename, INDEX_NAME)
+    success, failed = helpers.bulk(es, actions, raise_on_error=False) if actions else (0, [])
+    if failed:
+        raise helpers.BulkIndexError(f"{len(failed)} of {len(actions)} row(s) of {filename} failed to index", failed)
+    # UTC, so the `lt` below is not thrown off by a DST change
+    batch_ts = actions[0]["_source"]["indexed_at"] if actions else datetime.now(timezone.utc).isoformat()
+    es.delete_by_query(
+        index=INDEX_NAME,
+        query={"bool": {"filter": [
+            {"term": {"filename": filename}},
+            {"range": {"indexed_at": {"lt": batch_ts}}}
+        ]}},
+        conflicts='proceed',
+        refresh=True
+    )
+    upsert_file_summary(es, summarize_dataframe(df, filename))
+    return success
+
+
+def delete_workbook(es, filename):
+    """Remove every document (and the summary) of one workbook"""
+    es.delete_by_query(
+        index=INDEX_NAME,
+        query={"term": {"filename": filename}},
+        conflicts='proceed',
+        refresh=True
+    )
+    delete_file_summary(es, filename)
+
+
+# ============ GRAPH DELTA SYNC ============
+
+class SyncState:
+    """
+    Graph delta link, item-id -> filename map and items awaiting a retry,
+    persisted in Elasticsearch
+    """
+
+    # Item ids are used as object keys, so nothing but synced_at is mapped
+    MAPPINGS = {"dynamic": False, "properties": {"synced_at": {"type": "date"}}}
+
+    def __init__(self, es, index_name=SYNC_STATE_INDEX, doc_id=SYNC_STATE_ID):
+        self.es = es
+        self.index_name = index_name
+        self.doc_id = doc_id
+
+    def load(self):
+        result = self.es.options(ignore_status=404).get(index=self.index_name, id=self.doc_id)
+        if not result.get('found'):
+            return {"delta_link": None, "items": {}, "pending": {}, "synced_at": None}
+        return result['_source']
+
+    def save(self, state):
+        if not self.es.indices.exists(index=self.index_name):
+            self.es.indices.create(index=self.index_name, mappings=self.MAPPINGS)
+        state = dict(state, synced_at=datetime.now().isoformat())
+        self.es.index(index=self.index_name, id=self.doc_id, document=state, refresh=True)
+
+
+class GraphDeltaSync:
+    """
+    Applies OneDrive changes to the index using the drive delta API.
+
+    Delta runs on the drive root (OneDrive for Business only supports it
+    there), and items are matched to the folder by parentReference.id, since
+    delta responses leave parentReference.path out. Without a stored delta
+    link, or after Graph expires it (410 Gone), the sync enumerates the whole
+    drive, re-indexes every workbook in the folder and drops any it no
+    longer sees. Workbooks that fail are kept in the state's `pending` map
+    and retried on the next sync, so one bad file never blocks the rest.
+    """
+
+    def __init__(self, es, token_provider, state, folder=ONEDRIVE_FOLDER):
+        self.es = es
+        self.token_provider = token_provider
+        self.state = state
+        self.folder = folder.strip('/')
+        self._folder_id = None
+
+    def _get(self, url):
+        response = requests.get(url, headers={"Authorization": f"Bearer {self.token_provider()}"}, timeout=60)
+        response.raise_for_status()
+        return response
+
+    def folder_id(self):
+        """Drive item id of the watched folder, resolved once"""
+        if self._folder_id is None:
+            self._folder_id = self._get(f"{GRAPH_URL}/me/drive/root:/{self.folder}").json()['id']
+        return self._folder_id
+
+    def changes(self, resync=False):
+        """
+        (upserts: {item_id: item}, deletes: {key: filename}, new_state).
+        `resync` ignores the stored delta link and enumerates from scratch.
+        """
+        state = self.state.load()
+        items = dict(state.get('items') or {})
+        delta_link = None if resync else state.get('delta_link')
+        full = delta_link is None
+        url = delta_link or f"{GRAPH_URL}/me/drive/root/delta"
+        folder_id = self.folder_id()
+
+        upserts, deletes, seen = {}, {}, set()
+        while url:
+            page = self._get(url).json()
+            for item in page.get('value', []):
+                item_id = item['id']
+                in_folder = item.get('parentReference', {}).get('id') == folder_id
+                if 'deleted' in item or (item_id in items and not in_folder):
+                    # Deleted, or moved out of the folder
+                    if item_id in items:
+                        deletes[item_id] = items.pop(item_id)
+                        upserts.pop(item_id, None)
+                elif 'file' in item and in_folder and is_workbook(item.get('name', '')):
+                    old_name = items.get(item_id)
+                    if old_name and old_name != item['name']:
+                        deletes[item_id + ':renamed'] = old_name
+                    items[item_id] = item['name']
+                    upserts[item_id] = item
+                    seen.add(item_id)
+            url = page.get('@odata.nextLink')
+            delta_link = page.get('@odata.deltaLink')
+
+        if full:
+            # A full enumeration lists every live item; anything else is gone
+            for item_id in set(items) - seen:
+                deletes[item_id] = items.pop(item_id)
+
+        # Retry what failed last time, unless this delta supersedes it
+        for key, entry in (state.get('pending') or {}).items():
+            if entry['action'] == 'delete':
+                deletes.setdefault(key, entry['name'])
+            elif key in items and key not in upserts:
+                upserts[key] = {"id": key, "name": items[key]}
+
+        return upserts, deletes, {"delta_link": delta_link, "items": items}
+
+    def sync(self):
+        """Re-index changed workbooks and drop deleted ones; returns counts"""
+        try:
+            upserts, deletes, new_state = self.changes()
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 410:
+                raise
+            print("   ↻ Delta link expired (410 Gone); resyncing the folder")
+            upserts, deletes, new_state = self.changes(resync=True)
+
+        pending = {}
+        for key, filename in deletes.items():
+            try:
+                delete_workbook(self.es, filename)
+                print(f"   ✗ Removed {filename}")
+            except Exception as e:
+                print(f"   ✗ Could not remove {filename}: {e}")
+                pending[key] = {"name": filename, "action": "delete", "error": str(e)}
+        for item_id, item in upserts.items():
+            try:
+                content = self._get(f"{GRAPH_URL}/me/drive/items/{item_id}/content").content
+                df = pd.read_excel(io.BytesIO(content))
+                success = index_workbook(self.es, df, item['name'])
+                print(f"   ✓ Re-indexed {item['name']}: {success} docs")
+            except Exception as e:
+                print(f"   ✗ Could not re-index {item['name']}: {e}")
+                pending[item_id] = {"name": item['name'], "action": "upsert", "error": str(e)}
+
+        # Advance the delta link; failed items are retried from `pending`
+        new_state["pending"] = pending
+        self.state.save(new_state)
+        upserted = sum(1 for key in upserts if key not in pending)
+        deleted = sum(1 for key in deletes if key not in pending)
+        return {"upserted": upserted, "deleted": deleted, "failed": len(pending)}
+
+
+def msal_token_provider(cache_path=os.environ.get('MSAL_CACHE_PATH', '.msal_token_cache.json')):
+    """
+    Token provider for a long-running process: refreshes silently from a
+    persisted MSAL cache and falls back to device-code sign-in once.
+    """
+    import msal
+    from Connecting_onedrive_and_Indexing import CLIENT_ID, AUTHORITY, SCOPES
+
+    cache = msal.SerializableTokenCache()
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache.deserialize(f.read())
+    app = msal.PublicClientApplication(CLIENT_ID, authority=AUTHORITY, token_cache=cache)
+    lock = threading.Lock()
+
+    def provider():
+        with lock:
+            accounts = app.get_accounts()
+            result = app.acquire_token_silent(SCOPES, account=accounts[0]) if accounts else None
+            if not result:
+                flow = app.initiate_device_flow(scopes=SCOPES)
+                print(flow["message"])
+                result = app.acquire_token_by_device_flow(flow)
+            if "access_token" not in result:
+                raise RuntimeError(f"Authentication failed: {result}")
+            if cache.has_state_changed:
+                with open(cache_path, 'w') as f:
+                    f.write(cache.serialize())
+            return result["access_token"]
+
+    return provider
+
+
+def ensure_subscription(token_provider, subscription_id=None):
+    """Create or renew the Graph subscription for drive changes; returns its id"""
+    expires = (datetime.now(timezone.utc) + timedelta(minutes=SUBSCRIPTION_MINUTES)).isoformat()
+    headers = {"Authorization": f"Bearer {token_provider()}"}
+    if subscription_id:
+        response = requests.patch(
+            f"{GRAPH_URL}/subscriptions/{subscription_id}",
+            headers=headers, json={"expirationDateTime": expires}
+        )
+        if response.ok:
+            return subscription_id
+    response = requests.post(f"{GRAPH_URL}/subscriptions", headers=headers, json={
+        "changeType": "updated",
+        "notificationUrl": GRAPH_NOTIFICATION_URL,
+        "resource": "/me/drive/root",
+        "expirationDateTime": expires,
+        "clientState": GRAPH_CLIENT_STATE,
+    })
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+# ============ SERVICE ============
+
+class IndexerService:
+    """
+    Routes change events into one MicroBatcher and applies each batch.
+    A change that fails is queued again for the next batch, up to
+    MAX_RETRIES times in a row.
+    `local_indexer(path)`, `local_deleter(filename)` and `graph_sync()` are
+    injectable, so the service can be driven with simulated notifications.
+    """
+
+    def __init__(self, es=None, graph_sync=None, local_indexer=None, local_deleter=None,
+                 quiet=DEBOUNCE_SECONDS, max_delay=MAX_BATCH_DELAY, clock=time.monotonic):
+        self.es = es
+        self.graph_sync = graph_sync
+        self.local_indexer = local_indexer or self._index_local
+        self.local_deleter = local_deleter or (lambda filename: delete_workbook(self.es, filename))
+        self.batcher = MicroBatcher(self.apply_batch, quiet=quiet, max_delay=max_delay, clock=clock)
+        self.batches = 0
+        self.retries = {}
+
+    def _index_local(self, path):
+        df = pd.read_excel(path)
+        return index_workbook(self.es, df, os.path.basename(path))
+
+    # ---- event sources ----
+
+    def local_changed(self, path):
+        if is_workbook(path):
+            self.batcher.add((LOCAL, os.path.abspath(path)), UPSERT)
+
+    def local_deleted(self, path):
+        if is_workbook(path):
+            self.batcher.add((LOCAL, os.path.abspath(path)), DELETE)
+
+    def graph_notified(self):
+        # Any number of notifications collapse into one delta query
+        self.batcher.add((GRAPH, 'delta'), UPSERT)
+
+    # ---- batch application ----
+
+    def apply_batch(self, batch):
+        self.batches += 1
+        started = time.perf_counter()
+        print(f"\n📦 Batch {self.batches}: {len(batch)} change(s)")
+        for key, action in batch.items():
+            source, target = key
+            try:
+                if source == GRAPH:
+                    if self.graph_sync is not None:
+                        result = self.graph_sync()
+                        print(f"   ↻ Graph delta sync: {result}")
+                        if isinstance(result, dict) and result.get('failed'):
+                            raise RuntimeError(f"{result['failed']} item(s) left pending")
+                elif action == DELETE:
+                    self.local_deleter(os.path.basename(target))
+                    print(f"   ✗ Removed {os.path.basename(target)}")
+                elif os.path.exists(target):
+                    result = self.local_indexer(target)
+                    print(f"   ✓ Re-indexed {os.path.basename(target)}: {result}")
+            except Exception as e:
+                print(f"   ✗ {source} {target}: {e}")
+                self._retry(key, action)
+            else:
+                self.retries.pop(key, None)
+        print(f"   ⏱️  {time.perf_counter() - started:.2f}s")
+
+    def _retry(self, key, action):
+        attempts = self.retries.get(key, 0) + 1
+        if attempts > MAX_RETRIES:
+            del self.retries[key]
+            print(f"   ⚠️  Giving up on {key[1]} after {MAX_RETRIES} retries")
+            return
+        self.retries[key] = attempts
+        # A newer event for the same key, queued meanwhile, takes precedence
+        self.batcher.add(key, action, replace=False)
+
+
+def start_watcher(service, watch_dir=WATCH_DIR):
+    """watchdog observer feeding `service`; returns the started observer"""
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    class WorkbookEventHandler(FileSystemEventHandler):
+        def on_created(self, event):
+            if not event.is_directory:
+                service.local_changed(event.src_path)
+
+        def on_modified(self, event):
+            if not event.is_directory:
+                service.local_changed(event.src_path)
+
+        def on_deleted(self, event):
+            if not event.is_directory:
+                service.local_deleted(event.src_path)
+
+        def on_moved(self, event):
+            # Office saves via a temp file renamed over the workbook
+            if not event.is_directory:
+                service.local_deleted(event.src_path)
+                service.local_changed(event.dest_path)
+
+    observer = Observer()
+    observer.schedule(WorkbookEventHandler(), watch_dir, recursive=False)
+    observer.start()
+    return observer
+
+
+def create_webhook_app(service):
+    """Flask app receiving Graph change notifications"""
+    app = Flask(__name__)
+
+    @app.route('/api/graph/notifications', methods=['POST'])
+    def graph_notifications():
+        # Subscription validation handshake: echo the token as plain text
+        token = request.args.get('validationToken')
+        if token is not None:
+            return token, 200, {"Content-Type": "text/plain"}
+
+        notifications = (request.get_json(silent=True) or {}).get('value', [])
+        accepted = 0
+        for notification in notifications:
+            if GRAPH_CLIENT_STATE and notification.get('clientState') != GRAPH_CLIENT_STATE:
+                continue
+            service.graph_notified()
+            accepted += 1
+        # Graph expects a fast 2xx; the work happens in the next batch
+        return {"accepted": accepted}, 202
+
+    @app.route('/api/indexer/health', methods=['GET'])
+    def indexer_health():
+        return {"status": "running", "batches": service.batches}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='watch the folder and serve the Graph webhook')
+    run.add_argument('--no-graph', action='store_true', help='local watcher only')
+    sim = sub.add_parser('simulate', help='apply simulated change events once')
+    sim.add_argument('paths', nargs='*', help='workbooks to report as changed')
+    sim.add_argument('--deleted', nargs='*', default=[], help='workbooks to report as deleted')
+    sim.add_argument('--graph', action='store_true', help='also simulate a Graph notification')
+    args = parser.parse_args()
+
+    es = Elasticsearch([ES_URL])
+    use_graph = args.graph if args.command == 'simulate' else not args.no_graph
+    token_provider = msal_token_provider() if use_graph else None
+    graph_sync = GraphDeltaSync(es, token_provider, SyncState(es)).sync if use_graph else None
+
+    service = IndexerService(es, graph_sync=graph_sync)
+
+    if args.command == 'simulate':
+        for path in args.paths:
+            service.local_changed(path)
+        for path in args.deleted:
+            service.local_deleted(path)
+        if args.graph:
+            service.graph_notified()
+        service.batcher.flush_due(force=True)
+        return
+
+    print("\n" + "="*70)
+    print("🚀 CHANGE-DRIVEN INDEXER")
+    print("="*70)
+    service.batcher.start()
+    observer = start_watcher(service)
+    print(f"👀 Watching {WATCH_DIR}")
+
+    if graph_sync is not None and GRAPH_NOTIFICATION_URL:
+        subscription = {"id": ensure_subscription(token_provider)}
+        print(f"🔔 Graph subscription {subscription['id']} -> {GRAPH_NOTIFICATION_URL}")
+
+        def renew():
+            while True:
+                time.sleep(SUBSCRIPTION_MINUTES * 60 / 2)
+                try:
+                    subscription["id"] = ensure_subscription(token_provider, subscription["id"])
+                except Exception as e:
+                    print(f"❌ Subscription renewal failed: {e}")
+        threading.Thread(target=renew, name='subscription-renewal', daemon=True).start()
+        # Catch up on anything missed while the service was down
+        service.graph_notified()
+
+    try:
+        create_webhook_app(service).run(host='0.0.0.0', port=WEBHOOK_PORT)
+    finally:
+        observer.stop()
+        observer.join()
+        service.batcher.stop()
+
+
+if __name__ == '__main__':
+    main()
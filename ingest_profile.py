@@ -0,0 +1,137 @@
+"""
+Per-stage timing and counters for an indexer run.
+
+    profiler = IngestProfiler()
+    with profiler.stage('download', file=name):
+        ...
+    profiler.count('bytes', len(content), file=name)
+    profiler.write_report('index_run_report.json')
+
+Set INDEXER_PROFILE=cprofile to also dump a cProfile .prof file, or
+INDEXER_PROFILE=pyspy to attach `py-spy record` to this process for the
+duration of the run.
+"""
+import cProfile
+import json
+import os
+import signal
+import socket
+import subprocess
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_MODE = os.environ.get('INDEXER_PROFILE', '').lower()
+PROFILE_OUTPUT = os.environ.get('INDEXER_PROFILE_OUTPUT', '')
+REPORT_PATH = os.environ.get('INDEXER_REPORT_PATH', 'index_run_report.json')
+
+
+class IngestProfiler:
+    """Accumulates stage timings and counters per file and for the whole run"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        self._wall_seconds = None
+        self.stages = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.files = {}
+        self._profiler = None
+        self._pyspy = None
+
+    def _file(self, name):
+        if name not in self.files:
+            self.files[name] = {
+                "stages": defaultdict(float),
+                "counters": defaultdict(int),
+                "status": "ok",
+                "error": None,
+            }
+        return self.files[name]
+
+    @contextmanager
+    def stage(self, name, file=None):
+        """Time a block under stage `name`, for the run and optionally a file"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] += elapsed
+            if file is not None:
+                self._file(file)["stages"][name] += elapsed
+
+    def count(self, name, n=1, file=None):
+        self.counters[name] += n
+        if file is not None:
+            self._file(file)["counters"][name] += n
+
+    def fail(self, file, error):
+        entry = self._file(file)
+        entry["status"] = "failed"
+        entry["error"] = str(error)
+        self.count('files_failed')
+
+    def finish(self):
+        self._wall_seconds = time.perf_counter() - self._t0
+        self.stop_profiler()
+
+    def report(self):
+        wall = self._wall_seconds
+        if wall is None:
+            wall = time.perf_counter() - self._t0
+        return {
+            "host": socket.gethostname(),
+            "started_at": self.started_at.isoformat(),
+            "wall_seconds": round(wall, 3),
+            "stages": {k: round(v, 3) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "files": {
+                name: {
+                    "status": entry["status"],
+                    "error": entry["error"],
+                    "stages": {k: round(v, 3) for k, v in entry["stages"].items()},
+                    "counters": dict(entry["counters"]),
+                }
+                for name, entry in self.files.items()
+            },
+            "profile": {"mode": PROFILE_MODE or None, "output": self._profile_output()},
+        }
+
+    def write_report(self, path=REPORT_PATH):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    # ---- optional whole-process profilers ----
+
+    def _profile_output(self):
+        if not PROFILE_MODE:
+            return None
+        if PROFILE_OUTPUT:
+            return PROFILE_OUTPUT
+        return 'index_run.prof' if PROFILE_MODE == 'cprofile' else 'index_run.speedscope.json'
+
+    def start_profiler(self):
+        """Start the profiler selected by INDEXER_PROFILE, if any"""
+        if PROFILE_MODE == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif PROFILE_MODE == 'pyspy':
+            # py-spy samples from outside the process, so the run is unaffected
+            self._pyspy = subprocess.Popen([
+                'py-spy', 'record', '--pid', str(os.getpid()),
+                '--format', 'speedscope', '--output', self._profile_output()
+            ])
+
+    def stop_profiler(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self._profile_output())
+            self._profiler = None
+        if self._pyspy is not None:
+            # SIGINT makes py-spy flush its output before exiting
+            self._pyspy.send_signal(signal.SIGINT)
+            self._pyspy.wait(timeout=30)
+            self._pyspy = None
@@ -0,0 +1,143 @@
+"""
+Search over the raw workbooks without Elasticsearch.
+
+Used by Backend.py as its degraded mode while Elasticsearch is unavailable.
+Each workbook is parsed once into a column-oriented DataFrame and cached on
+disk (keyed by file size and mtime), so a fallback search is a handful of
+vectorized substring filters rather than re-reading Excel files per request.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+from excel_documents import COLUMN_MAP, clean_value
+from result_rows import ResultRow, SOURCE_FIELDS
+
+# Request parameter -> column searched (same fields search_excel filters on)
+SEARCH_COLUMNS = {
+    'fieldName': 'field_name',
+    'fieldType': 'field_type',
+    'visibilityRules': 'visibility_rules',
+    'visibilityAttributes': 'visibility_attributes',
+}
+
+
+def _norm(header):
+    return str(header).lower().replace(" ", "").replace("_", "")
+
+
+_HEADERS = {_norm(header): es_field for header, es_field in COLUMN_MAP.items()}
+
+
+def load_workbook_frame(path):
+    """One workbook as a DataFrame with index field names, filename and row_number"""
+    df = pd.read_excel(path)
+    columns = {}
+    for header in df.columns:
+        es_field = _HEADERS.get(_norm(header))
+        if es_field and es_field not in columns:
+            columns[es_field] = [clean_value(v) for v in df[header]]
+    frame = pd.DataFrame(columns, index=df.index)
+    for es_field in COLUMN_MAP.values():
+        if es_field not in frame.columns:
+            frame[es_field] = None
+    frame['filename'] = os.path.basename(path)
+    frame['row_number'] = df.index + 2  # +2 because Excel row 1 is header
+    # Lower-cased copies of the searched columns, so filtering is one pass each
+    for column in SEARCH_COLUMNS.values():
+        frame[f"_{column}_lc"] = frame[column].fillna('').str.lower()
+    return frame
+
+
+class LocalWorkbookIndex:
+    """
+    In-memory, column-oriented copy of every workbook in `excel_dir`.
+    The directory is re-scanned at most every `recheck` seconds; only new or
+    changed workbooks are re-parsed, and parsed copies persist in `cache_dir`.
+    """
+
+    def __init__(self, excel_dir, cache_dir, recheck=30.0):
+        self.excel_dir = excel_dir
+        self.cache_dir = cache_dir
+        self.recheck = recheck
+        self._lock = threading.Lock()
+        self._frames = {}      # filename -> (signature, DataFrame)
+        self._combined = None
+        self._checked_at = None
+
+    def _cache_path(self, filename, signature):
+        digest = hashlib.sha1(f"{filename}:{signature}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.pkl")
+
+    def _load_frame(self, path, filename, signature):
+        cache_path = self._cache_path(filename, signature)
+        if os.path.exists(cache_path):
+            try:
+                return pd.read_pickle(cache_path)
+            except Exception:
+                pass
+        frame = load_workbook_frame(path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        frame.to_pickle(cache_path)
+        return frame
+
+    def refresh(self, force=False):
+        """Pick up new, changed or removed workbooks"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.recheck:
+                return
+            self._checked_at = now
+
+            seen, changed = set(), False
+            for filename in os.listdir(self.excel_dir):
+                if not filename.lower().endswith(('.xlsx', '.xls')) or filename.startswith('~$'):
+                    continue
+                path = os.path.join(self.excel_dir, filename)
+                stat = os.stat(path)
+                signature = f"{stat.st_size}-{stat.st_mtime_ns}"
+                seen.add(filename)
+                current = self._frames.get(filename)
+                if current is None or current[0] != signature:
+                    self._frames[filename] = (signature, self._load_frame(path, filename, signature))
+                    changed = True
+            for filename in set(self._frames) - seen:
+                del self._frames[filename]
+                changed = True
+
+            if changed or self._combined is None:
+                frames = [frame for _, frame in self._frames.values()]
+                self._combined = pd.concat(frames, ignore_index=True) if frames else None
+
+    def search(self, params, size=1000):
+        """
+        Same filters and result shape as Backend.run_search. There is no
+        collapse: workbooks carry no cluster ids, so each row is its own
+        cluster as in a freshly ingested index.
+        """
+        self.refresh()
+        frame = self._combined
+        if frame is None:
+            return [], 0
+
+        mask = pd.Series(True, index=frame.index)
+        filename = (params.get('fileName') or '').strip()
+        if filename:
+            if not filename.endswith('.xlsx'):
+                filename = filename + '.xlsx'
+            mask &= frame['filename'] == filename
+        for param, column in SEARCH_COLUMNS.items():
+            value = (params.get(param) or '').strip().lower()
+            if value:
+                mask &= frame[f"_{column}_lc"].str.contains(value, regex=False)
+
+        matched = frame[mask]
+        total = len(matched)
+        page = matched.head(size)[SOURCE_FIELDS]
+        page = page.astype(object).where(page.notna(), None)
+        page['row_number'] = page['row_number'].astype(int).tolist()
+        results = [ResultRow(*row) for row in page.itertuples(index=False, name=None)]
+        return results, total
@@ -0,0 +1,148 @@
+"""
+Request metrics and sampled structured logging for the search API.
+
+    init_app(app)   - per-route latency/in-flight metrics and GET /metrics
+    log_event(...)  - one JSON log line, kept for a SEARCH_LOG_SAMPLE_RATE
+                      fraction of calls (errors are always kept)
+"""
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+LOG_SAMPLE_RATE = float(os.environ.get('SEARCH_LOG_SAMPLE_RATE', 0.01))
+
+logger = logging.getLogger('excel_search')
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .075, .1, .25, .5, .75, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    'search_api_request_seconds', 'End-to-end request latency',
+    ['route', 'method', 'status'], buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    'search_api_in_flight_requests', 'Requests currently being served',
+    ['route'], multiprocess_mode='livesum'
+)
+ES_TOOK = Histogram(
+    'search_api_es_took_seconds', "Elasticsearch-reported 'took' time",
+    ['route'], buckets=LATENCY_BUCKETS
+)
+ES_ROUNDTRIP = Histogram(
+    'search_api_es_roundtrip_seconds', 'Client-side Elasticsearch call time',
+    ['route'], buckets=LATENCY_BUCKETS
+)
+RESULT_SIZE = Histogram(
+    'search_api_result_count', 'Results returned per search',
+    ['route'], buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+CACHE_REQUESTS = Counter(
+    'search_api_cache_requests_total', 'Cache lookups by outcome',
+    ['cache', 'result']
+)
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=logging.INFO):
+    """Send the API logger to stderr as one JSON object per line"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(_JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def log_event(event, level=logging.INFO, exc_info=False, **fields):
+    """Structured log line; INFO events are sampled, warnings and errors are not"""
+    if level < logging.WARNING and random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+
+def _route():
+    if not has_request_context():
+        return 'background'
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def observe_es(took_ms, started):
+    """Record ES server time ('took') and client round trip for the current route"""
+    route = _route()
+    ES_TOOK.labels(route).observe(took_ms / 1000.0)
+    ES_ROUNDTRIP.labels(route).observe(time.perf_counter() - started)
+
+
+def observe_results(count):
+    RESULT_SIZE.labels(_route()).observe(count)
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+    g._metrics_route = _route()
+    IN_FLIGHT.labels(g._metrics_route).inc()
+
+
+def _after_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is not None:
+        REQUEST_LATENCY.labels(
+            g._metrics_route, request.method, str(response.status_code)
+        ).observe(time.perf_counter() - start)
+    return response
+
+
+def _teardown_request(exc):
+    route = g.pop('_metrics_route', None)
+    if route is not None:
+        IN_FLIGHT.labels(route).dec()
+
+
+def metrics_view():
+    # Under gunicorn each worker writes to PROMETHEUS_MULTIPROC_DIR; aggregate them
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead(pid):
+    """gunicorn child_exit hook: drop a dead worker's live gauges"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def init_app(app):
+    """Install request hooks and expose GET /metrics on `app`"""
+    configure_logging()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -0,0 +1,63 @@
+"""
+Compact representation of search results, shared by Backend.py,
+local_search.py and server/app.py.
+
+A result is a ResultRow: a slotted dataclass with one attribute per output
+key (about 110 bytes, against ~650 for the equivalent 12-key dict). orjson
+serializes it straight to a JSON object, so no per-row dict is ever built;
+the columnar shape takes positional tuples from it with one attrgetter call.
+
+SOURCE_FIELDS is the matching `_source` projection, so Elasticsearch only
+sends (and the client only parses) the fields a result needs.
+"""
+from dataclasses import dataclass
+from operator import attrgetter
+
+# Result key -> index field, in column order
+RESULT_FIELDS = (
+    ('fieldName', 'field_name'),
+    ('description', 'description'),
+    ('fieldType', 'field_type'),
+    ('format', 'format'),
+    ('fieldLength', 'field_length'),
+    ('defaultValue', 'default_value'),
+    ('validValues', 'valid_values'),
+    ('fieldBehaviour', 'field_behaviour'),
+    ('visibilityRules', 'visibility_rules'),
+    ('visibilityAttributes', 'visibility_attributes'),
+    ('sourceFile', 'filename'),
+    ('rowNumber', 'row_number'),
+)
+
+RESULT_COLUMNS = tuple(key for key, _ in RESULT_FIELDS)
+SOURCE_FIELDS = [field for _, field in RESULT_FIELDS]
+
+
+@dataclass(slots=True)
+class ResultRow:
+    fieldName: object = ''
+    description: object = ''
+    fieldType: object = ''
+    format: object = ''
+    fieldLength: object = ''
+    defaultValue: object = ''
+    validValues: object = ''
+    fieldBehaviour: object = ''
+    visibilityRules: object = ''
+    visibilityAttributes: object = ''
+    sourceFile: object = ''
+    rowNumber: object = ''
+
+    @classmethod
+    def from_source(cls, source):
+        """Row from an index document (`hit['_source']`); missing fields become ''"""
+        get = source.get
+        return cls(*[get(field, '') for field in SOURCE_FIELDS])
+
+
+row_values = attrgetter(*RESULT_COLUMNS)
+
+
+def to_columnar_rows(rows):
+    """{"columns": [...], "rows": [[...], ...]} for a list of ResultRow"""
+    return {"columns": list(RESULT_COLUMNS), "rows": [row_values(row) for row in rows]}
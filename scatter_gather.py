@@ -0,0 +1,182 @@
+"""
+Fan a search out to several indices/clusters and merge the hits.
+
+Index sets are configured with SEARCH_INDEX_SETS, a JSON object mapping an
+index-set (tenant) name to its backends:
+
+    {"finance": [{"name": "fin-eu", "url": "http://es-eu:9200", "index": "excel_fields_data_fin"},
+                 {"name": "fin-us", "url": "http://es-us:9200", "index": "excel_fields_data_fin"}]}
+
+A set may instead be an object with its backends and the directory of its
+workbooks, searched in degraded mode when none of the backends answer:
+
+    {"finance": {"backends": [...], "fallback_dir": "/srv/excel/finance"}}
+
+Every backend is queried concurrently with its own timeout. Slow or failing
+backends are dropped from the merge and the result is flagged partial, so
+latency is bounded by the slowest healthy backend rather than the sum.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from circuit_breaker import CircuitOpenError, is_unavailable
+
+BACKEND_TIMEOUT = float(os.environ.get('SEARCH_BACKEND_TIMEOUT', 5))
+MAX_FANOUT_THREADS = int(os.environ.get('SEARCH_FANOUT_THREADS', 16))
+
+
+class BackendsUnavailableError(RuntimeError):
+    """Every backend of an index set timed out, was unreachable or had its circuit open"""
+
+
+@dataclass(frozen=True)
+class SearchBackend:
+    name: str
+    url: str
+    index: str
+
+
+def _configured_sets():
+    """SEARCH_INDEX_SETS as {lower-cased set name: {"backends": [...], ...}}"""
+    raw = os.environ.get('SEARCH_INDEX_SETS', '')
+    configured = {}
+    for set_name, config in (json.loads(raw) if raw else {}).items():
+        if isinstance(config, list):
+            config = {"backends": config}
+        configured[set_name.strip().lower()] = config
+    return configured
+
+
+def load_index_sets(default_url, default_index):
+    """
+    Index sets from SEARCH_INDEX_SETS, always including a 'default' set.
+    Set names are lower-cased, matching how requests name them.
+    """
+    index_sets = {"default": [SearchBackend("default", default_url, default_index)]}
+    for set_name, config in _configured_sets().items():
+        index_sets[set_name] = [
+            SearchBackend(
+                b.get('name') or f"{set_name}-{i}",
+                b.get('url', default_url),
+                b.get('index', default_index)
+            )
+            for i, b in enumerate(config.get('backends', []))
+        ]
+    return index_sets
+
+
+def load_fallback_dirs(default_dir):
+    """
+    Workbook directory of each index set that has one: `default_dir` for
+    'default' (unless overridden) and `fallback_dir` from SEARCH_INDEX_SETS.
+    Sets without a directory have no degraded mode.
+    """
+    fallback_dirs = {"default": default_dir} if default_dir else {}
+    for set_name, config in _configured_sets().items():
+        if config.get('fallback_dir'):
+            fallback_dirs[set_name] = config['fallback_dir']
+    return fallback_dirs
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_FANOUT_THREADS, thread_name_prefix='fanout')
+        return _executor
+
+
+def reset_executor():
+    """Drop the thread pool; threads do not survive a fork"""
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+def _sort_key(item):
+    hit, _ = item
+    src = hit.get('_source', {})
+    # Highest score first, then a stable order across backends
+    return (-(hit.get('_score') or 0.0), src.get('filename') or '', src.get('row_number') or 0)
+
+
+def scatter_search(backends, client_for, timeout=BACKEND_TIMEOUT, size=1000, breaker_for=None, **search_kwargs):
+    """
+    Run es.search(index=backend.index, size=size, **search_kwargs) on every
+    backend concurrently and merge the hits by score.
+
+    `client_for(url)` returns the Elasticsearch client for a cluster URL and
+    the optional `breaker_for(url)` its CircuitBreaker; backends whose
+    breaker is open are skipped without a network call.
+    Returns a dict with 'hits' (list of (hit, backend) pairs, best first),
+    'total', 'took' (slowest backend), 'partial' and per-backend 'backends'.
+    Raises BackendsUnavailableError if no backend could answer, or the
+    backend's own error if the query itself was rejected (e.g. a 400).
+    """
+    def _one(backend):
+        start = time.perf_counter()
+        client = client_for(backend.url).options(request_timeout=timeout)
+        if breaker_for is None:
+            result = client.search(index=backend.index, size=size, **search_kwargs)
+        else:
+            result = breaker_for(backend.url).call(
+                client.search, index=backend.index, size=size, **search_kwargs
+            )
+        return result, time.perf_counter() - start
+
+    executor = _get_executor()
+    futures = {executor.submit(_one, backend): backend for backend in backends}
+    done, _ = wait(futures, timeout=timeout)
+
+    merged, statuses, client_errors = [], [], []
+    total, took, partial = 0, 0, False
+    for future, backend in futures.items():
+        status = {"name": backend.name, "index": backend.index}
+        if future not in done:
+            future.cancel()
+            status["status"] = "timeout"
+            partial = True
+        elif isinstance(future.exception(), CircuitOpenError):
+            status["status"] = "circuit_open"
+            partial = True
+        elif future.exception() is not None:
+            status["status"] = "error"
+            status["error"] = str(future.exception())
+            partial = True
+            if not is_unavailable(future.exception()):
+                client_errors.append(future.exception())
+        else:
+            result, elapsed = future.result()
+            status["status"] = "ok"
+            status["took_ms"] = result['took']
+            status["elapsed_ms"] = round(elapsed * 1000, 1)
+            total += result['hits']['total']['value']
+            took = max(took, result['took'])
+            # filter_path leaves out hits.hits entirely when nothing matched
+            merged.extend((hit, backend) for hit in result['hits'].get('hits', []))
+        statuses.append(status)
+
+    if all(status["status"] != "ok" for status in statuses):
+        # A rejected query is the caller's problem, not an outage
+        if client_errors:
+            raise client_errors[0]
+        failures = "; ".join(f"{s['name']}: {s.get('error', s['status'])}" for s in statuses)
+        raise BackendsUnavailableError(f"All search backends failed ({failures})")
+
+    if len(backends) > 1:
+        merged.sort(key=_sort_key)
+    return {
+        "hits": merged[:size],
+        "total": total,
+        "took": took,
+        "partial": partial,
+        "backends": statuses,
+    }
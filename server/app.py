@@ -1,10 +1,17 @@
 from flask import Flask, request
 from flask_cors import CORS
 import os
+import sys
 import pandas as pd
 
+# Shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from result_rows import ResultRow, to_columnar_rows
+from wire_format import init_app as init_wire_format, wants_columnar
+
 app = Flask(__name__)
 CORS(app)
+init_wire_format(app)
 
 EXCEL_DIR = os.path.join(os.path.dirname(__file__), 'excel-files')
 
@@ -22,8 +29,6 @@ def get_excel_files():
     return {"files": files}
 
 
-import math
-
 @app.route('/api/search-excel', methods=['POST'])
 
 def search_excel():
@@ -80,31 +85,28 @@ def search_excel():
                         search_field_mappings[key] = normalized_cols[norm_header]
                         break
 
-            for _, row in df.iterrows():
-                # If all search fields are empty, include all rows
-                if all(not v for v in search_params.values()):
-                    match = True
-                else:
-                    match = True
-                    for key, val in search_params.items():
-                        if val:
-                            excel_col = search_field_mappings.get(key)
-                            if excel_col:
-                                cell = str(row[excel_col]).lower() if not pd.isna(row[excel_col]) else ''
-                                if val not in cell:
-                                    match = False
-                                    break
-                if match:
-                    result ={}
-                    for camel_key, excel_col in search_field_mappings.items():
-                        value = row[excel_col] if excel_col in row else ""
-                        if isinstance(value, float) and math.isnan(value):
-                            value = ""
-                        result[camel_key] = value
-                    result['sourceFile'] = file
+            # Plain Python values per column (no per-row Series or numpy scalars)
+            columns = {
+                key: ["" if pd.isna(v) else v for v in df[excel_col].tolist()]
+                for key, excel_col in search_field_mappings.items()
+            }
+            # Search fields that were given and exist in this workbook
+            filters = [
+                (val, [str(v).lower() for v in columns[key]])
+                for key, val in search_params.items()
+                if val and key in columns
+            ]
+
+            for i in range(len(df)):
+                if all(val in cells[i] for val, cells in filters):
+                    result = ResultRow(sourceFile=file, rowNumber=i + 2)
+                    for key, values in columns.items():
+                        setattr(result, key, values[i])
                     results.append(result)
         except Exception as e:
             print(f"Error processing file {file}: {e}")
+    if wants_columnar(params):
+        return to_columnar_rows(results)
     return {"results": results}
 
 if __name__ == '__main__':
@@ -0,0 +1,60 @@
+"""
+Request coalescing: concurrent calls with the same key share one execution.
+
+    flight = SingleFlight()
+    body = flight.do(key, expensive_fn)
+
+The first caller for a key runs `expensive_fn`; callers arriving while it is
+running wait and receive the same result (or the same exception). Nothing is
+kept after the call completes - that is the response cache's job.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self, on_shared=None):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # on_shared(shared: bool) is called once per do(), e.g. for metrics
+        self.on_shared = on_shared
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if self.on_shared is not None:
+            self.on_shared(not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,202 @@
+"""
+Snapshot the search indices to a filesystem repository and restore them
+into another cluster, so a new node or dev box is searchable in minutes
+instead of after a full OneDrive crawl.
+
+A snapshot holds the catalog index(es), the per-file/global summaries and
+the change-driven indexer's sync state (Graph delta link and item map).
+After a restore, --replay-delta asks Graph only for what changed since
+that delta link; --replay-local re-indexes local workbooks modified after
+the snapshot was taken.
+
+The repository directory must be listed in `path.repo` of every node
+(elasticsearch.yml), e.g. path.repo: ["/mnt/es-snapshots"].
+
+    python snapshot_index.py create --keep 5
+    python snapshot_index.py list
+    python snapshot_index.py restore                    # latest snapshot
+    python snapshot_index.py restore --name excel-fields-20250101-120000 --force --replay-delta
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+from elasticsearch import Elasticsearch
+
+from field_stats import SUMMARY_INDEX
+from index_template import INDEX_PATTERNS, put_index_template
+from indexer_service import SYNC_STATE_INDEX
+
+ES_URL = os.environ.get('ES_URL', 'http://localhost:9200')
+SNAPSHOT_REPOSITORY = os.environ.get('SNAPSHOT_REPOSITORY', 'excel_fields_backups')
+SNAPSHOT_LOCATION = os.environ.get('SNAPSHOT_LOCATION', '/mnt/es-snapshots/excel_fields')
+SNAPSHOT_PREFIX = 'excel-fields-'
+
+SNAPSHOT_INDICES = INDEX_PATTERNS + [SUMMARY_INDEX, SYNC_STATE_INDEX]
+
+
+def register_repository(es, name=SNAPSHOT_REPOSITORY, location=SNAPSHOT_LOCATION, readonly=False):
+    """Register (or update) the shared-filesystem repository"""
+    es.snapshot.create_repository(
+        name=name,
+        repository={
+            "type": "fs",
+            "settings": {"location": location, "compress": True, "readonly": readonly}
+        }
+    )
+
+
+def list_snapshots(es, repository=SNAPSHOT_REPOSITORY):
+    """Our snapshots in the repository, oldest first"""
+    result = es.snapshot.get(repository=repository, snapshot=f"{SNAPSHOT_PREFIX}*", sort='start_time')
+    return [s for s in result['snapshots'] if s.get('state') == 'SUCCESS']
+
+
+def create_snapshot(es, repository=SNAPSHOT_REPOSITORY, name=None, keep=0):
+    """Snapshot the catalog, summary and sync-state indices; returns the snapshot info"""
+    name = name or f"{SNAPSHOT_PREFIX}{datetime.now():%Y%m%d-%H%M%S}"
+    result = es.options(request_timeout=3600).snapshot.create(
+        repository=repository,
+        snapshot=name,
+        indices=SNAPSHOT_INDICES,
+        ignore_unavailable=True,
+        include_global_state=False,
+        metadata={"source": ES_URL, "created_by": "snapshot_index.py"},
+        wait_for_completion=True
+    )
+    snapshot = result['snapshot']
+    if snapshot['state'] != 'SUCCESS':
+        raise RuntimeError(f"Snapshot {name} finished as {snapshot['state']}: {snapshot.get('failures')}")
+
+    if keep:
+        for old in list_snapshots(es, repository)[:-keep]:
+            es.snapshot.delete(repository=repository, snapshot=old['snapshot'])
+            print(f"   🗑️  Deleted old snapshot {old['snapshot']}")
+    return snapshot
+
+
+def restore_snapshot(es, repository=SNAPSHOT_REPOSITORY, name=None, force=False):
+    """
+    Restore a snapshot (default: the latest) and re-register the index
+    template. Existing copies of the indices are only replaced with `force`:
+    they are closed and restored over, and reopened if the restore fails.
+    """
+    if name is None:
+        snapshots = list_snapshots(es, repository)
+        if not snapshots:
+            raise RuntimeError(f"No snapshots in repository {repository}")
+        snapshot = snapshots[-1]
+    else:
+        snapshot = es.snapshot.get(repository=repository, snapshot=name)['snapshots'][0]
+
+    existing = [index for index in snapshot['indices'] if es.indices.exists(index=index)]
+    if existing:
+        if not force:
+            raise RuntimeError(f"Indices already exist: {', '.join(existing)} (use --force to replace)")
+        es.indices.close(index=existing)
+
+    try:
+        result = es.options(request_timeout=3600).snapshot.restore(
+            repository=repository,
+            snapshot=snapshot['snapshot'],
+            indices=snapshot['indices'],
+            include_global_state=False,
+            wait_for_completion=True
+        )
+    except Exception:
+        if existing:
+            es.indices.open(index=existing)
+        raise
+    shards = result['snapshot']['shards']
+    if shards['failed']:
+        raise RuntimeError(f"Restore of {snapshot['snapshot']}: {shards['failed']} of {shards['total']} shards failed")
+
+    health = es.cluster.health(index=snapshot['indices'], wait_for_status='yellow', timeout='120s')
+    if health['timed_out']:
+        raise RuntimeError(f"Restored indices still {health['status']} after 120s")
+    # Templates are global state, which the snapshot leaves out
+    put_index_template(es)
+    return snapshot
+
+
+def replay_graph_delta(es):
+    """Apply OneDrive changes made since the restored delta link"""
+    from indexer_service import GraphDeltaSync, SyncState, msal_token_provider
+
+    state = SyncState(es)
+    if not state.load().get('delta_link'):
+        print("⚠️  Snapshot has no Graph delta link; skipping replay (run indexer_service.py to sync)")
+        return None
+    return GraphDeltaSync(es, msal_token_provider(), state).sync()
+
+
+def replay_local(es, excel_dir, since):
+    """Re-index workbooks in `excel_dir` modified after `since` (epoch seconds)"""
+    from indexer_service import index_workbook, is_workbook
+    import pandas as pd
+
+    replayed = 0
+    for filename in sorted(os.listdir(excel_dir)):
+        path = os.path.join(excel_dir, filename)
+        if is_workbook(filename) and os.path.getmtime(path) > since:
+            success = index_workbook(es, pd.read_excel(path), filename)
+            print(f"   ✓ Re-indexed {filename}: {success} docs")
+            replayed += 1
+    return replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--es-url', default=ES_URL)
+    parser.add_argument('--repository', default=SNAPSHOT_REPOSITORY)
+    parser.add_argument('--location', default=SNAPSHOT_LOCATION, help='repository path on the ES nodes')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    create = sub.add_parser('create', help='snapshot the search indices')
+    create.add_argument('--name')
+    create.add_argument('--keep', type=int, default=0, help='delete all but the newest N snapshots')
+
+    sub.add_parser('list', help='list snapshots in the repository')
+
+    restore = sub.add_parser('restore', help='restore a snapshot into this cluster')
+    restore.add_argument('--name', help='snapshot to restore (default: latest)')
+    restore.add_argument('--force', action='store_true', help='close indices that already exist and restore over them')
+    restore.add_argument('--replay-delta', action='store_true', help='apply OneDrive changes since the snapshot')
+    restore.add_argument('--replay-local', metavar='DIR', help='re-index workbooks in DIR changed since the snapshot')
+    args = parser.parse_args()
+
+    es = Elasticsearch([args.es_url], request_timeout=120)
+    register_repository(es, args.repository, args.location, readonly=args.command == 'restore')
+
+    if args.command == 'list':
+        for snapshot in list_snapshots(es, args.repository):
+            print(f"{snapshot['snapshot']}  {snapshot['start_time']}  {', '.join(snapshot['indices'])}")
+        return
+
+    started = time.perf_counter()
+    if args.command == 'create':
+        print(f"📸 Creating snapshot in {args.repository} ({args.location})...")
+        snapshot = create_snapshot(es, args.repository, args.name, args.keep)
+        print(f"✅ {snapshot['snapshot']}: {', '.join(snapshot['indices'])} "
+              f"in {time.perf_counter() - started:.1f}s")
+        return
+
+    print(f"♻️  Restoring from {args.repository} ({args.location})...")
+    snapshot = restore_snapshot(es, args.repository, args.name, args.force)
+    print(f"✅ Restored {snapshot['snapshot']}: {', '.join(snapshot['indices'])} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    if args.replay_delta:
+        print("\n↻ Replaying OneDrive changes since the snapshot...")
+        print(f"   {replay_graph_delta(es)}")
+    if args.replay_local:
+        since = datetime.fromisoformat(snapshot['start_time'].replace('Z', '+00:00'))
+        since = since.replace(tzinfo=since.tzinfo or timezone.utc).timestamp()
+        print(f"\n↻ Replaying local workbooks changed since {snapshot['start_time']}...")
+        print(f"   {replay_local(es, args.replay_local, since)} workbook(s) re-indexed")
+    print(f"\n⏱️  Ready in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
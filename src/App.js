@@ -12,6 +12,18 @@ function App() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
 
+  // Expand the columnar search response ({columns, rows}) into row objects
+  const fromColumnar = (data) => {
+    if (!data.columns || !data.rows) return data.results || [];
+    return data.rows.map((row) => {
+      const obj = {};
+      data.columns.forEach((col, i) => {
+        obj[col] = row[i];
+      });
+      return obj;
+    });
+  };
+
   useEffect(() => {
     fetch('/api/excel-files')
       .then((res) => res.json())
@@ -30,6 +42,7 @@ function App() {
         fieldType,
         visibilityRules,
         visibilityAttributes,
+        format: 'columnar',
       };
       if (selectedFile) payload.fileName = selectedFile;
 
@@ -39,7 +52,7 @@ function App() {
         body: JSON.stringify(payload),
       });
       const data = await res.json();
-      setResults(data.results || []);
+      setResults(fromColumnar(data));
     } catch (err) {
       setError('Search failed');
     } finally {
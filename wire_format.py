@@ -0,0 +1,99 @@
+"""
+Compact, compressed JSON responses for the search APIs.
+
+    init_app(app)       - orjson serialization and negotiated br/gzip encoding
+    dumps_bytes(obj)    - the same serialization, for pre-built response bodies
+    wants_columnar(...) - whether the client asked for the columnar shape
+
+Used by both Backend.py and server/app.py.
+"""
+import gzip
+import os
+
+import orjson
+from flask import request
+from flask.json.provider import JSONProvider
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    """Fallback for types orjson does not handle natively (e.g. pandas.Timestamp)"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps_bytes(obj):
+    """Serialize `obj` to JSON bytes with the same options as the Flask provider"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype='application/json')
+
+
+def wants_columnar(params=None):
+    """Columnar shape requested via JSON body {"format": "columnar"} or ?format=columnar"""
+    if params and params.get('format') == 'columnar':
+        return True
+    return request.args.get('format') == 'columnar'
+
+
+def _accepted_encoding():
+    """Highest-q encoding we support (br on a tie); q=0 means refused"""
+    accepted = request.accept_encodings
+    supported = ('br', 'gzip') if brotli is not None else ('gzip',)
+    encoding = max(supported, key=lambda name: (accepted[name], name == 'br'))
+    return encoding if accepted[encoding] > 0 else None
+
+
+def _compress_response(response):
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _accepted_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == 'br':
+        data = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Install orjson serialization and response compression on `app`"""
+    app.json = OrjsonProvider(app)
+    app.after_request(_compress_response)